@@ -0,0 +1,72 @@
+import heapq
+import random
+from podcast import chunking
+
+
+TTS_BASE_SECONDS = 2.0
+TTS_SECONDS_PER_BYTE = 0.005
+TTS_CONCURRENCY = 4
+SCRIPT_WORDS = [300, 700, 1500, 3000]
+SCRIPT_VOCABULARY = ["기술", "뉴스", "인공지능이", "발표했습니다.", "흥미롭네요.", "그렇죠"]
+SEED = 42
+
+
+def greedy_split(text: str, max_bytes: int = chunking.TTS_MAX_CHUNK_BYTES) -> list[str]:
+    # The line-packing splitter used before the balanced partitioner
+    chunks: list[str] = []
+    current_lines: list[str] = []
+    current_size = 0
+    for line in text.splitlines(keepends=True):
+        line_size = chunking.size(line)
+        if line_size > max_bytes:
+            raise ValueError("Single line exceeds max_bytes limit.")
+        if current_size + line_size > max_bytes and current_lines:
+            chunks.append("".join(current_lines))
+            current_lines, current_size = [line], line_size
+        else:
+            current_lines.append(line)
+            current_size += line_size
+    if current_lines:
+        chunks.append("".join(current_lines))
+    return chunks
+
+
+def synthesis_latency(chunks: list[str], concurrency: int = TTS_CONCURRENCY) -> float:
+    workers = [0.0] * concurrency
+    for chunk in chunks:
+        start = heapq.heappop(workers)
+        heapq.heappush(workers, start + TTS_BASE_SECONDS + chunking.size(chunk) * TTS_SECONDS_PER_BYTE)
+    return max(workers)
+
+
+def make_script(words: int, rng: random.Random, monologue: bool = False) -> str:
+    lines = []
+    remaining = words
+    while remaining > 0:
+        turn_words = min(remaining, words // 2 if monologue and not lines else rng.randint(8, 40))
+        sentence = " ".join(rng.choice(SCRIPT_VOCABULARY) for _ in range(turn_words))
+        lines.append(f"진행자{len(lines) % 2 + 1}: {sentence}\n")
+        remaining -= turn_words
+    return "".join(lines)
+
+
+def run() -> None:
+    rng = random.Random(SEED)
+    print(f"{'script':<18}{'bytes':>8}{'greedy':>16}{'balanced':>16}{'gain':>8}")
+    for words in SCRIPT_WORDS:
+        for monologue in (False, True):
+            script = make_script(words, rng, monologue=monologue)
+            balanced = chunking.partition(script, parallelism=TTS_CONCURRENCY)
+            new = synthesis_latency(balanced)
+            try:
+                greedy = greedy_split(script)
+                old = synthesis_latency(greedy)
+                old_text, gain = f"{old:6.1f}s ({len(greedy)})", f"{old / new:6.2f}x"
+            except ValueError:
+                old_text, gain = "ValueError", "-"
+            name = f"{words} words{' (long)' if monologue else ''}"
+            print(f"{name:<18}{chunking.size(script):>8}{old_text:>16}{f'{new:6.1f}s ({len(balanced)})':>16}{gain:>8}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,100 @@
+import asyncio
+import itertools
+import os
+import types
+import httpx
+from common import http
+from podcast import clients
+
+
+# A single MPEG-2 Layer III frame (24 kHz, 32 kbps), 24ms of silence
+MP3_FRAME = bytes([0xFF, 0xF3, 0x44, 0xC4]) + bytes(92)
+SCRIPT_TURNS = 24
+SCRIPT_SENTENCE = "오늘 소개할 기술 뉴스는 성능과 안정성에 관한 이야기입니다."
+STREAM_DELTA_CHARS = 24
+ARTICLE_FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "article.html")
+ARTICLE_ETAG = '"bench-article"'
+ARTICLE_ADDRESS = "93.184.216.34"  # any public address, article hosts are never resolved or contacted
+
+
+class FakeOpenAI:
+    def __init__(self, latency: float, stream_delay: float):
+        self.responses = _FakeResponses(latency, stream_delay)
+
+    async def close(self) -> None:
+        pass
+
+
+class _FakeResponses:
+    def __init__(self, latency: float, stream_delay: float):
+        self.latency = latency
+        self.stream_delay = stream_delay
+        # Every script is unique so that the TTS cache never short-circuits a benchmark run
+        self._scripts = itertools.count()
+
+    async def create(self, model: str, instructions: str, input: str, stream: bool = False, **kwargs):
+        await asyncio.sleep(self.latency)
+        if not stream:
+            return types.SimpleNamespace(output_text=f"{input} 기사 요약: {SCRIPT_SENTENCE}")
+        return _FakeStream(self._script(next(self._scripts)), self.stream_delay)
+
+    @staticmethod
+    def _script(number: int) -> str:
+        turns = [f"진행자{i % 2 + 1}: {number}번째 대본 {i}. {SCRIPT_SENTENCE * 3}\n" for i in range(SCRIPT_TURNS)]
+        return "".join(turns)
+
+
+class _FakeStream:
+    def __init__(self, text: str, delay: float):
+        self.text = text
+        self.delay = delay
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def __aiter__(self):
+        for start in range(0, len(self.text), STREAM_DELTA_CHARS):
+            await asyncio.sleep(self.delay)
+            yield types.SimpleNamespace(
+                type="response.output_text.delta", delta=self.text[start : start + STREAM_DELTA_CHARS]
+            )
+
+
+class FakeTTS:
+    def __init__(self, latency: float, seconds_per_byte: float):
+        self.latency = latency
+        self.seconds_per_byte = seconds_per_byte
+
+    async def synthesize_speech(self, input, voice, audio_config):
+        size = len(input.text.encode())
+        await asyncio.sleep(self.latency + size * self.seconds_per_byte)
+        return types.SimpleNamespace(audio_content=MP3_FRAME * max(1, size // 20))
+
+
+def article_client() -> httpx.AsyncClient:
+    # Every article URL serves the recorded page, revalidations are answered with 304 like a real server would
+    with open(ARTICLE_FIXTURE, encoding="utf-8") as f:
+        page = f.read()
+
+    def handle(req: httpx.Request) -> httpx.Response:
+        if req.headers.get("If-None-Match") == ARTICLE_ETAG:
+            return httpx.Response(304, headers={"ETag": ARTICLE_ETAG})
+        headers = {"Content-Type": "text/html; charset=utf-8", "ETag": ARTICLE_ETAG}
+        return httpx.Response(200, text=page, headers=headers)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handle))
+
+
+async def resolve_public(host: str, port: int) -> list[str]:
+    return [ARTICLE_ADDRESS]
+
+
+def install(openai_latency: float, stream_delay: float, tts_latency: float, tts_seconds_per_byte: float) -> None:
+    # The podcast pipeline reaches its backends only through the lazily created clients
+    clients._oai_client = FakeOpenAI(openai_latency, stream_delay)
+    clients._tts_client = FakeTTS(tts_latency, tts_seconds_per_byte)
+    clients._http_client = article_client()
+    http.resolve = resolve_public
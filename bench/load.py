@@ -0,0 +1,216 @@
+import argparse
+import asyncio
+import gc
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+import httpx
+from redis import asyncio as aioredis
+from bench import fakes
+from news import registry as news_registry, service as news_service
+from podcast import files as podcast_files, service as podcast_service, tts as podcast_tts
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+THRESHOLDS_PATH = os.path.join(os.path.dirname(__file__), "thresholds.json")
+TEXT_MODEL = "gpt-4.1-mini"
+TTS_MODEL = "gemini-2.5-flash-tts"
+
+
+@dataclass
+class Result:
+    name: str
+    latencies: list[float]
+    elapsed: float
+
+    @property
+    def rps(self) -> float:
+        return len(self.latencies) / self.elapsed
+
+    def percentile_ms(self, p: float) -> float:
+        ordered = sorted(self.latencies)
+        return ordered[max(0, math.ceil(p * len(ordered)) - 1)] * 1000
+
+
+async def measure(name: str, call: Callable[[], Awaitable[None]], requests: int, concurrency: int = 1) -> Result:
+    latencies: list[float] = []
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - started)
+
+    # Start every case from a clean heap so a pending full collection does not land in its latencies
+    gc.collect()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return Result(name, latencies, time.perf_counter() - started)
+
+
+async def create_redis() -> aioredis.Redis:
+    # BENCH_REDIS_URL must point at a scratch database, it is flushed before the run
+    redis_url = os.environ.get("BENCH_REDIS_URL")
+    if redis_url is not None:
+        r = aioredis.from_url(redis_url, decode_responses=True)
+        await r.flushdb()
+        return r
+
+    try:
+        import fakeredis
+    except ImportError:
+        sys.exit("Install fakeredis or set BENCH_REDIS_URL to run the benchmarks.")
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+def fixture_client() -> httpx.AsyncClient:
+    # Every page of a source serves the same front page fixture, items are deduplicated by id
+    fixtures = {}
+    for source in news_registry.SOURCES.values():
+        with open(os.path.join(FIXTURES_DIR, f"{source.name}.html"), encoding="utf-8") as f:
+            fixtures[httpx.URL(source.url).host] = f.read()
+    return httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda req: httpx.Response(200, text=fixtures[req.url.host]))
+    )
+
+
+async def bench_scrapers(r: aioredis.Redis, args: argparse.Namespace) -> list[Result]:
+    client = fixture_client()
+    try:
+        return [
+            await measure(
+                f"scrap_items {source.name}",
+                lambda source=source: news_service.scrap_items(r, client, source),
+                args.scrape_requests,
+            )
+            for source in news_registry.SOURCES.values()
+        ]
+    finally:
+        await client.aclose()
+
+
+async def bench_generation(r: aioredis.Redis, args: argparse.Namespace) -> tuple[Result, list[str]]:
+    source = news_registry.SOURCES["hackernews"]
+    urls = await news_service.get_top_item_urls(r, source, 5)
+    filenames: list[str] = []
+
+    async def generate():
+        filename = f"hackernews_bench{len(filenames)}"
+        filenames.append(filename)
+        async for status in podcast_service.generate_podcast(
+            r, urls, TEXT_MODEL, TTS_MODEL, filename, source.podcasts_key
+        ):
+            pass
+        if status != podcast_service.STATUS_COMPLETED:
+            raise RuntimeError(f"Podcast generation ended with status '{status}'.")
+
+    return await measure("generate_podcast", generate, args.generations), filenames
+
+
+async def bench_endpoints(r: aioredis.Redis, filename: str, args: argparse.Namespace) -> list[Result]:
+    os.environ.setdefault("CLIENT_HOST", "http://localhost")
+    import main
+
+    # Router lifespans start schedulers and workers, the read endpoints only need Redis
+    main.app.state.redis = r
+    transport = httpx.ASGITransport(app=main.app)
+    endpoints = [
+        ("GET /hackernews/top", "/hackernews/top?limit=20", {}),
+        ("GET /geeknews/top", "/geeknews/top?limit=20", {}),
+        ("GET /hackernews/podcasts", "/hackernews/podcasts?limit=20", {}),
+        ("GET /feed", "/feed?limit=20", {}),
+        ("GET /podcasts/search", "/podcasts/search?q=기술+뉴스&limit=20", {}),
+        ("GET /podcasts/{filename}.mp3", f"/podcasts/{filename}.mp3", {}),
+        ("GET /podcasts/{filename}.mp3 (range)", f"/podcasts/{filename}.mp3", {"Range": "bytes=1024-65535"}),
+    ]
+    results = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, path, headers in endpoints:
+
+            async def call(path=path, headers=headers):
+                res = await client.get(path, headers=headers)
+                if res.status_code not in (200, 206):
+                    raise RuntimeError(f"{path} responded with {res.status_code}.")
+
+            results.append(await measure(name, call, args.requests, args.concurrency))
+    return results
+
+
+def check_thresholds(results: list[Result], thresholds: dict[str, dict[str, float]]) -> list[str]:
+    failures = []
+    for result in results:
+        limits = thresholds.get(result.name, {})
+        for limit_name, actual in (("p50_ms", result.percentile_ms(0.5)), ("p99_ms", result.percentile_ms(0.99))):
+            if limit_name in limits and actual > limits[limit_name]:
+                failures.append(f"{result.name}: {limit_name} {actual:.1f} > {limits[limit_name]}")
+        if "min_rps" in limits and result.rps < limits["min_rps"]:
+            failures.append(f"{result.name}: rps {result.rps:.1f} < {limits['min_rps']}")
+    return failures
+
+
+def report(results: list[Result]) -> None:
+    print(f"{'benchmark':<40}{'n':>6}{'rps':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for result in results:
+        print(
+            f"{result.name:<40}{len(result.latencies):>6}{result.rps:>10.1f}"
+            f"{result.percentile_ms(0.5):>10.1f}{result.percentile_ms(0.99):>10.1f}"
+        )
+
+
+async def run(args: argparse.Namespace) -> list[Result]:
+    fakes.install(args.openai_latency, args.stream_delay, args.tts_latency, args.tts_seconds_per_byte)
+    # The fake TTS backend has no quota, only the concurrency limit applies
+    podcast_tts._bucket = podcast_tts.TokenBucket(rate=1e9, capacity=podcast_tts.TTS_MAX_CONCURRENCY)
+    os.makedirs(podcast_files.PODCASTS_DIR, exist_ok=True)
+
+    r = await create_redis()
+    try:
+        results = await bench_scrapers(r, args)
+        generation, filenames = await bench_generation(r, args)
+        results.append(generation)
+        results += await bench_endpoints(r, filenames[0], args)
+        return results
+    finally:
+        await r.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the read endpoints, scrapers and podcast pipeline.")
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=10, help="concurrent requests per endpoint")
+    parser.add_argument("--scrape-requests", type=int, default=20, help="scrap_items calls per source")
+    parser.add_argument("--generations", type=int, default=3, help="generate_podcast runs")
+    parser.add_argument("--openai-latency", type=float, default=0.05, help="seconds per fake OpenAI request")
+    parser.add_argument("--stream-delay", type=float, default=0.002, help="seconds between fake script deltas")
+    parser.add_argument("--tts-latency", type=float, default=0.1, help="seconds per fake TTS request")
+    parser.add_argument("--tts-seconds-per-byte", type=float, default=0.00005, help="extra fake TTS seconds per byte")
+    parser.add_argument("--thresholds", default=THRESHOLDS_PATH, help="JSON file of limits, '' to disable")
+    args = parser.parse_args()
+
+    # Generated podcasts and the TTS cache are written relative to the working directory
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            results = asyncio.run(run(args))
+        finally:
+            os.chdir(cwd)
+    report(results)
+
+    if args.thresholds:
+        with open(args.thresholds, encoding="utf-8") as f:
+            failures = check_thresholds(results, json.load(f))
+        for failure in failures:
+            print(f"FAIL {failure}")
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import os
+import time
+from common import parsing
+from news import registry as news_registry
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+ITERATIONS = 200
+
+
+def run() -> None:
+    backends = parsing.available_backends()
+    print(f"{'source':<12}{'backend':<10}{'items':>8}{'ms/page':>10}{'vs bs4':>8}")
+    for source in news_registry.SOURCES.values():
+        with open(os.path.join(FIXTURES_DIR, f"{source.name}.html"), encoding="utf-8") as f:
+            html = f.read()
+
+        expected = source.parsers["bs4"](html)
+        timings = {}
+        for backend in backends:
+            items = source.parsers[backend](html)
+            if items != expected:
+                raise AssertionError(f"{source.name}: the {backend} backend disagrees with bs4.")
+            started = time.perf_counter()
+            for _ in range(ITERATIONS):
+                source.parsers[backend](html)
+            timings[backend] = (time.perf_counter() - started) / ITERATIONS * 1000
+
+        for backend, ms in timings.items():
+            print(f"{source.name:<12}{backend:<10}{len(expected):>8}{ms:>10.2f}{timings['bs4'] / ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    run()
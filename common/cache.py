@@ -0,0 +1,69 @@
+import hashlib
+import json
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime
+from fastapi import Request, Response
+from redis import asyncio as aioredis
+from starlette import status
+from common import metrics, store
+
+
+CACHE_MAX_PAGES = 256
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    version: str
+    data: str  # pre-serialised JSON array of the page members
+    etag: str
+
+
+_pages: dict[tuple[str, int, int, str], CachedPage] = {}
+
+
+async def get_page(
+    r: aioredis.Redis,
+    key: str,
+    limit: int,
+    page: int,
+    load: Callable[[aioredis.Redis, list[str]], Awaitable[list[str]]] | None = None,
+) -> CachedPage:
+    version = await r.get(store.version_key(key)) or "0"
+    cached = _pages.get((key, limit, page, version))
+    metrics.record_cache("page", hit=cached is not None)
+    if cached is not None:
+        return cached
+
+    start, end = (page - 1) * limit, page * limit - 1
+    async with r.pipeline(transaction=True) as pipe:
+        pipe.get(store.version_key(key))
+        pipe.zrevrange(key, start, end)
+        version, members = await pipe.execute()
+    version = version or "0"
+
+    if load is not None:
+        members = await load(r, members)
+    etag = hashlib.sha1(f"{key}:{version}:{limit}:{page}".encode()).hexdigest()
+    cached = CachedPage(version=version, data=f"[{','.join(members)}]", etag=f'"{etag}"')
+    _store_page((key, limit, page, version), cached)
+    return cached
+
+
+def page_response(request: Request, cached: CachedPage, message: str) -> Response:
+    headers = {"ETag": cached.etag}
+    if request.headers.get("If-None-Match") == cached.etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    timestamp = datetime.now().isoformat()
+    content = f'{{"data":{cached.data},"message":{json.dumps(message)},"timestamp":"{timestamp}"}}'
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+def _store_page(cache_key: tuple[str, int, int, str], cached: CachedPage) -> None:
+    key, _, _, version = cache_key
+    for stale_key in [k for k in _pages if k[0] == key and k[3] != version]:
+        del _pages[stale_key]
+    while len(_pages) >= CACHE_MAX_PAGES:
+        del _pages[next(iter(_pages))]
+    _pages[cache_key] = cached
@@ -0,0 +1,102 @@
+import asyncio
+import ipaddress
+import socket
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+import httpx
+
+
+HTTP_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0)
+HTTP_HEADERS = {"User-Agent": "n2p-api (+https://github.com/gymynnym/n2p-api)"}
+HTTP_MAX_RETRIES = 3
+HTTP_BACKOFF_SECONDS = 0.5
+HTTP_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# url -> (etag, last_modified) of the last successful response
+_validators: dict[str, tuple[str | None, str | None]] = {}
+
+
+def create_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=HTTP_TIMEOUT,
+        limits=HTTP_LIMITS,
+        headers=HTTP_HEADERS,
+        follow_redirects=True,
+    )
+
+
+async def fetch(client: httpx.AsyncClient, url: str, conditional: bool = True) -> str | None:
+    etag, last_modified = _validators.get(url, (None, None)) if conditional else (None, None)
+    res = await get(client, url, headers=validator_headers(etag, last_modified))
+    if res.status_code == httpx.codes.NOT_MODIFIED:
+        return None  # unchanged since the last fetch
+    _validators[url] = (res.headers.get("ETag"), res.headers.get("Last-Modified"))
+    return res.text
+
+
+async def get(client: httpx.AsyncClient, url: str, headers: dict[str, str] | None = None) -> httpx.Response:
+    # Retries transport errors and transient statuses, any other error status is raised
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        try:
+            res = await client.get(url, headers=headers)
+        except httpx.TransportError:
+            if attempt == HTTP_MAX_RETRIES:
+                raise
+        else:
+            if res.status_code == httpx.codes.NOT_MODIFIED:
+                return res
+            if res.status_code not in HTTP_RETRY_STATUSES or attempt == HTTP_MAX_RETRIES:
+                res.raise_for_status()
+                return res
+
+        await asyncio.sleep(HTTP_BACKOFF_SECONDS * 2**attempt)
+
+
+async def resolve(host: str, port: int) -> list[str]:
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return [info[4][0] for info in infos]
+
+
+async def public_address(url: httpx.URL) -> str:
+    # Scraped links are untrusted, they must not reach private, loopback or link-local services
+    if url.scheme not in ("http", "https") or not url.host:
+        raise ValueError(f"Refusing to fetch non-HTTP URL '{url}'.")
+    try:
+        addresses = [str(ipaddress.ip_address(url.host))]
+    except ValueError:
+        addresses = await resolve(url.host, url.port or (443 if url.scheme == "https" else 80))
+    for address in addresses:
+        ip = ipaddress.ip_address(address)
+        if ip.version == 6 and ip.ipv4_mapped is not None:
+            ip = ip.ipv4_mapped
+        if not ip.is_global:
+            raise ValueError(f"Refusing to fetch '{url}', {url.host} resolves to non-public address {ip}.")
+    return addresses[0]
+
+
+@asynccontextmanager
+async def stream_public(
+    client: httpx.AsyncClient, url: httpx.URL, headers: dict[str, str]
+) -> AsyncIterator[httpx.Response]:
+    # Connects to the address that was checked, resolving the host again could return an internal one.
+    # The Host header and TLS server name still carry the original host, so certificates are verified against it,
+    # and the connection is not pooled since the pool only tells connections apart by address.
+    address = await public_address(url)
+    async with client.stream(
+        "GET",
+        url.copy_with(host=address),
+        headers=headers | {"Host": url.netloc.decode("ascii"), "Connection": "close"},
+        extensions={"sni_hostname": url.raw_host.decode("ascii")},
+        follow_redirects=False,
+    ) as res:
+        yield res
+
+
+def validator_headers(etag: str | None, last_modified: str | None) -> dict[str, str]:
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
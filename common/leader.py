@@ -0,0 +1,63 @@
+import asyncio
+import functools
+import uuid
+from redis import asyncio as aioredis
+from common import store
+
+
+LEADER_LEASE_SECONDS = 30
+LEADER_RENEW_SECONDS = 10
+
+_RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class LeaderLease:
+    def __init__(self, r: aioredis.Redis, name: str, lease_seconds: int = LEADER_LEASE_SECONDS):
+        self.r = r
+        self.key = f"leader:{name}"
+        self.token = uuid.uuid4().hex
+        self.lease_ms = lease_seconds * 1000
+        self.is_leader = False
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self.is_leader:
+            self.is_leader = False
+            await store.delete_if_equal(self.r, self.key, self.token)
+
+    def run_if_leader(self, func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not self.is_leader or await self.r.get(self.key) != self.token:
+                return None
+            return await func(*args, **kwargs)
+
+        return wrapper
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                self.is_leader = await self._acquire_or_renew()
+            except aioredis.RedisError as e:
+                print(f"Error during leader election: {e}")
+                self.is_leader = False
+            await asyncio.sleep(LEADER_RENEW_SECONDS)
+
+    async def _acquire_or_renew(self) -> bool:
+        if self.is_leader and await self.r.eval(_RENEW_SCRIPT, 1, self.key, self.token, self.lease_ms):
+            return True
+        return bool(await self.r.set(self.key, self.token, nx=True, px=self.lease_ms))
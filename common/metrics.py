@@ -0,0 +1,197 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from redis import asyncio as aioredis
+from redis.asyncio.client import Pipeline
+
+try:
+    from opentelemetry import trace
+except ImportError:  # tracing is optional, spans are skipped without the package
+    trace = None
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+REDIS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+
+_registry: list["_Metric"] = []
+_tracer = trace.get_tracer("n2p-api") if trace is not None else None
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], object] = {}
+        if not labelnames:
+            self._values[()] = self._initial()
+        _registry.append(self)
+
+    def _initial(self):
+        return 0.0
+
+    def _key(self, labels: dict[str, object]) -> tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> Iterator[tuple[str, tuple[tuple[str, str], ...], float]]:
+        for key, value in self._values.items():
+            yield "", tuple(zip(self.labelnames, key)), value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self._samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.buckets = buckets
+        super().__init__(name, documentation, labelnames)
+
+    def _initial(self):
+        # per-bucket counts, then sum and count
+        return [0] * len(self.buckets) + [0.0, 0]
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = self._initial()
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[i] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    def _samples(self) -> Iterator[tuple[str, tuple[tuple[str, str], ...], float]]:
+        for key, state in self._values.items():
+            labels = tuple(zip(self.labelnames, key))
+            for bound, count in zip(self.buckets, state):
+                yield "_bucket", labels + (("le", _format_value(bound)),), count
+            yield "_bucket", labels + (("le", "+Inf"),), state[-1]
+            yield "_sum", labels, state[-2]
+            yield "_count", labels, state[-1]
+
+
+PODCAST_STAGE_SECONDS = Histogram("podcast_stage_seconds", "Duration of each podcast generation stage.", ("stage",))
+PODCAST_TTS_CHUNK_SECONDS = Histogram(
+    "podcast_tts_chunk_seconds", "Duration of uncached Text-to-Speech synthesis per chunk.", ("model",)
+)
+PODCAST_GENERATIONS_ACTIVE = Gauge("podcast_generations_active", "Number of podcasts currently being generated.")
+PODCAST_PREGENERATIONS = Counter(
+    "podcast_pregenerations_total", "Outcomes of scheduled podcast pre-generation.", ("source", "result")
+)
+SCRAPE_SECONDS = Histogram("scrape_duration_seconds", "Duration of news source scrapes.", ("source",))
+SCRAPE_ITEMS = Gauge("scrape_items", "Number of items parsed by the last scrape.", ("source",))
+REDIS_COMMAND_SECONDS = Histogram(
+    "redis_command_seconds", "Latency of Redis commands and pipelines.", ("command",), buckets=REDIS_BUCKETS
+)
+CACHE_REQUESTS = Counter("cache_requests_total", "Number of cache lookups.", ("cache", "result"))
+CACHE_HIT_RATIO = Gauge("cache_hit_ratio", "Ratio of cache lookups that were hits.", ("cache",))
+
+
+def render() -> str:
+    return "\n".join(line for metric in _registry for line in metric.render()) + "\n"
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+    hits, misses = CACHE_REQUESTS.get(cache=cache, result="hit"), CACHE_REQUESTS.get(cache=cache, result="miss")
+    CACHE_HIT_RATIO.set(hits / (hits + misses), cache=cache)
+
+
+@dataclass
+class Timer:
+    seconds: float = 0.0
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[None]:
+    if _tracer is None:
+        yield
+        return
+    with _tracer.start_as_current_span(name, attributes={key: str(value) for key, value in attributes.items()}):
+        yield
+
+
+@contextmanager
+def timed(histogram: Histogram, span_name: str, **labels) -> Iterator[Timer]:
+    timer = Timer()
+    started = time.perf_counter()
+    with span(span_name, **labels):
+        try:
+            yield timer
+        finally:
+            timer.seconds = time.perf_counter() - started
+            histogram.observe(timer.seconds, **labels)
+
+
+class InstrumentedRedis(aioredis.Redis):
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            REDIS_COMMAND_SECONDS.observe(time.perf_counter() - started, command=str(args[0]).lower())
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> Pipeline:
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+class InstrumentedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        started = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            command = "multi" if self.is_transaction else "pipeline"
+            REDIS_COMMAND_SECONDS.observe(time.perf_counter() - started, command=command)
+
+
+def _format_labels(labels: tuple[tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
@@ -0,0 +1,102 @@
+import asyncio
+import os
+from collections.abc import Callable
+from html.parser import HTMLParser
+from typing import TypeVar
+
+try:
+    from lxml import html as lxml_html
+except ImportError:  # lxml is optional, the stdlib backend is used without it
+    lxml_html = None
+
+
+T = TypeVar("T")
+
+PARSER_BACKENDS = ("lxml", "stdlib", "bs4")
+SCRAPER_PARSER = os.environ.get("SCRAPER_PARSER", "auto")
+
+
+def resolve_backend(name: str = SCRAPER_PARSER) -> str:
+    if name == "auto":
+        return "lxml" if lxml_html is not None else "stdlib"
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend '{name}', expected one of {PARSER_BACKENDS}.")
+    if name == "lxml" and lxml_html is None:
+        raise RuntimeError("The lxml parser backend requires the lxml package.")
+    return name
+
+
+def available_backends() -> list[str]:
+    return [name for name in PARSER_BACKENDS if name != "lxml" or lxml_html is not None]
+
+
+async def parse(parsers: dict[str, Callable[[str], T]], html: str, backend: str | None = None) -> T:
+    return await asyncio.to_thread(parsers[backend or _backend], html)
+
+
+def lxml_document(html: str):
+    return lxml_html.fromstring(html)
+
+
+def xpath_class(name: str) -> str:
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+
+class ScopedHTMLParser(HTMLParser):
+    # Classes whose elements are tracked, `inside(name)` is true between their start and end tags
+    scopes: tuple[str, ...] = ()
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._open: dict[str, list] = {}  # class -> [tag, nesting depth of that tag]
+        self._text: list[str] | None = None
+
+    def inside(self, name: str) -> bool:
+        return name in self._open
+
+    def capture(self) -> None:
+        self._text = []
+
+    def captured(self) -> str:
+        text, self._text = "".join(self._text or ()), None
+        return text
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        for scope in self._open.values():
+            if scope[0] == tag:
+                scope[1] += 1
+        attributes = dict(attrs)
+        classes = (attributes.get("class") or "").split()
+        for name in self.scopes:
+            if name in classes and name not in self._open:
+                self._open[name] = [tag, 1]
+                self.enter(name, attributes)
+        self.start(tag, attributes)
+
+    def handle_endtag(self, tag: str) -> None:
+        self.end(tag)
+        for name, scope in list(self._open.items()):
+            if scope[0] == tag:
+                scope[1] -= 1
+                if scope[1] == 0:
+                    del self._open[name]
+                    self.leave(name)
+
+    def handle_data(self, data: str) -> None:
+        if self._text is not None:
+            self._text.append(data)
+
+    def enter(self, name: str, attrs: dict[str, str | None]) -> None:
+        pass
+
+    def leave(self, name: str) -> None:
+        pass
+
+    def start(self, tag: str, attrs: dict[str, str | None]) -> None:
+        pass
+
+    def end(self, tag: str) -> None:
+        pass
+
+
+_backend = resolve_backend()
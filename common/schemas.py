@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Generic, Optional, TypeVar, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 T = TypeVar("T")
 
@@ -17,6 +17,18 @@ class NewsItem(BaseModel):
     url: str = Field(min_length=5, max_length=512, examples=["https://example.com"])
 
 
+class FeedItem(NewsItem):
+    source: str = Field(examples=["hackernews"])
+    score: float = Field(examples=[412.5])
+
+
+class FeedPage(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    items: list[FeedItem]
+    next_cursor: Optional[str] = Field(default=None, alias="nextCursor", examples=["412.5:1"])
+
+
 class GeneratePodcastRequest(BaseModel):
     limit: int = Field(gt=0, le=10, default=3, examples=[3])
     filename_prefix: str = Field(
@@ -24,3 +36,45 @@ class GeneratePodcastRequest(BaseModel):
     )
     text_model: Literal["gpt-4.1-mini", "gpt-4.1"] = Field(alias="textModel")
     tts_model: Literal["gemini-2.5-flash-tts", "gemini-2.5-pro-tts"] = Field(alias="ttsModel")
+
+
+class PodcastJob(BaseModel):
+    id: str = Field(examples=["0f8fad5b2d9b4d7c9a3b8f1e2c4d6a7b"])
+    status: str = Field(examples=["generating_audio"])
+    filename: str = Field(examples=["hackernews_1731234567_0f8fad5b"])
+    done: Optional[int] = Field(default=None, examples=[3])
+    total: Optional[int] = Field(default=None, examples=[6])
+
+
+class PodcastMetadata(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    filename: str = Field(examples=["hackernews_1731234567_0f8fad5b"])
+    source: Optional[str] = Field(default=None, examples=["hackernews"])
+    urls: list[str] = Field(default_factory=list, examples=[["https://example.com/article"]])
+    text_model: Optional[str] = Field(default=None, alias="textModel", examples=["gpt-4.1-mini"])
+    tts_model: Optional[str] = Field(default=None, alias="ttsModel", examples=["gemini-2.5-flash-tts"])
+    byte_size: Optional[int] = Field(default=None, alias="byteSize", examples=[4718592])
+    duration_seconds: Optional[float] = Field(default=None, alias="durationSeconds", examples=[294.5])
+    chunk_count: Optional[int] = Field(default=None, alias="chunkCount", examples=[8])
+    timings: dict[str, float] = Field(default_factory=dict, examples=[{"summarize": 12.3, "audio": 48.1}])
+    created_at: Optional[datetime] = Field(default=None, alias="createdAt")
+
+
+class PodcastSearchResult(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    filename: str = Field(examples=["hackernews_1731234567_0f8fad5b"])
+    source: Optional[str] = Field(default=None, examples=["hackernews"])
+    created_at: datetime = Field(alias="createdAt")
+    snippet: str = Field(examples=["진행자1: 오늘은 새로운 스토리지 엔진 이야기를 해보겠습니다…"])
+    score: float = Field(examples=[7.25])
+
+
+class PodcastEviction(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    filename: str = Field(examples=["hackernews_1731234567_0f8fad5b"])
+    reason: Literal["deleted", "max_age", "quota"] = Field(examples=["quota"])
+    byte_size: int = Field(alias="byteSize", examples=[4718592])
+    evicted_at: datetime = Field(alias="evictedAt")
@@ -0,0 +1,68 @@
+import asyncio
+import os
+from collections.abc import Awaitable, Callable
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+import httpx
+from common import http
+
+
+SCRAPE_PAGES = int(os.environ.get("SCRAPE_PAGES", "3"))
+SCRAPE_MIN_INTERVAL_SECONDS = int(os.environ.get("SCRAPE_MIN_INTERVAL_SECONDS", "300"))
+SCRAPE_MAX_INTERVAL_SECONDS = int(os.environ.get("SCRAPE_MAX_INTERVAL_SECONDS", "3600"))
+SCRAPE_CHURN_FAST = 0.2  # poll twice as often above this share of changed items
+SCRAPE_CHURN_SLOW = 0.05  # back off below it
+SCRAPE_JITTER_RATIO = 0.1  # spread the scrapes of different sources apart
+
+
+async def fetch_pages(client: httpx.AsyncClient, urls: list[str]) -> list[str] | None:
+    pages = await asyncio.gather(*[http.fetch(client, url) for url in urls])
+    if all(page is None for page in pages):
+        return None  # nothing changed since the last scrape
+
+    # Items are diffed against the previous scrape as a whole, so every page is needed once one has changed
+    missing = [i for i, page in enumerate(pages) if page is None]
+    refetched = await asyncio.gather(*[http.fetch(client, urls[i], conditional=False) for i in missing])
+    for i, page in zip(missing, refetched):
+        pages[i] = page
+    return pages
+
+
+class AdaptiveInterval:
+    def __init__(
+        self,
+        min_seconds: float = SCRAPE_MIN_INTERVAL_SECONDS,
+        max_seconds: float = SCRAPE_MAX_INTERVAL_SECONDS,
+    ):
+        self.min_seconds = min_seconds
+        self.max_seconds = max_seconds
+        self.seconds = max_seconds
+
+    def update(self, churn: float) -> float:
+        if churn >= SCRAPE_CHURN_FAST:
+            self.seconds = max(self.min_seconds, self.seconds / 2)
+        elif churn <= SCRAPE_CHURN_SLOW:
+            self.seconds = min(self.max_seconds, self.seconds * 1.5)
+        return self.seconds
+
+
+def add_adaptive_job(
+    scheduler: AsyncIOScheduler,
+    job_id: str,
+    func: Callable[..., Awaitable[float | None]],
+    args: list,
+) -> None:
+    interval = AdaptiveInterval()
+
+    async def run():
+        churn = await func(*args)
+        if churn is not None:  # None when another instance holds the scheduler lease
+            seconds = interval.update(churn)
+            scheduler.reschedule_job(job_id, trigger="interval", seconds=seconds, jitter=seconds * SCRAPE_JITTER_RATIO)
+
+    scheduler.add_job(
+        func=run,
+        trigger="interval",
+        seconds=interval.seconds,
+        jitter=interval.seconds * SCRAPE_JITTER_RATIO,
+        id=job_id,
+    )
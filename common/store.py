@@ -0,0 +1,67 @@
+from redis import asyncio as aioredis
+import hashlib
+import time
+
+
+_DELETE_IF_EQUAL_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def version_key(key: str) -> str:
+    return f"{key}:version"
+
+
+async def sync_sorted_set(r: aioredis.Redis, key: str, items: dict[str, tuple[str, float]]) -> int:
+    # items: item id -> (member, score), only members whose content hash changed are written
+    hashes_key, members_key = f"{key}:hashes", f"{key}:members"
+    async with r.pipeline(transaction=False) as pipe:
+        pipe.hgetall(hashes_key)
+        pipe.hgetall(members_key)
+        old_hashes, old_members = await pipe.execute()
+
+    hashes = {item_id: _content_hash(member, score) for item_id, (member, score) in items.items()}
+    changed = [item_id for item_id, content_hash in hashes.items() if old_hashes.get(item_id) != content_hash]
+    removed = [item_id for item_id in old_hashes if item_id not in items]
+    if not changed and not removed:
+        return 0
+
+    stale_members = [
+        old_members[item_id]
+        for item_id in changed + removed
+        if item_id in old_members and (item_id in removed or old_members[item_id] != items[item_id][0])
+    ]
+    async with r.pipeline(transaction=True) as pipe:
+        if not old_hashes:
+            # First tracked sync, drop members written before hashes were recorded
+            pipe.delete(key, hashes_key, members_key)
+        if stale_members:
+            pipe.zrem(key, *stale_members)
+        if changed:
+            pipe.zadd(key, {items[item_id][0]: items[item_id][1] for item_id in changed})
+            pipe.hset(hashes_key, mapping={item_id: hashes[item_id] for item_id in changed})
+            pipe.hset(members_key, mapping={item_id: items[item_id][0] for item_id in changed})
+        if removed:
+            pipe.hdel(hashes_key, *removed)
+            pipe.hdel(members_key, *removed)
+        pipe.set(version_key(key), time.time_ns())
+        await pipe.execute()
+    return len(changed) + len(removed)
+
+
+async def add_to_sorted_set(r: aioredis.Redis, key: str, mapping: dict[str, float]) -> None:
+    async with r.pipeline(transaction=True) as pipe:
+        pipe.zadd(key, mapping)
+        pipe.set(version_key(key), time.time_ns())
+        await pipe.execute()
+
+
+async def delete_if_equal(r: aioredis.Redis, key: str, value: str) -> bool:
+    return bool(await r.eval(_DELETE_IF_EQUAL_SCRIPT, 1, key, value))
+
+
+def _content_hash(member: str, score: float) -> str:
+    return hashlib.sha1(f"{member}\n{score}".encode()).hexdigest()
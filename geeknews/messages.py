@@ -1,2 +0,0 @@
-GET_SUCCESS = "GeekNews item retrieved successfully."
-PODCASTS_GET_SUCCESS = "GeekNews podcasts retrieved successfully."
@@ -1,2 +0,0 @@
-GET_SUCCESS = "HackerNews item retrieved successfully."
-PODCASTS_GET_SUCCESS = "HackerNews podcasts retrieved successfully."
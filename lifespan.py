@@ -1,22 +1,32 @@
 from contextlib import asynccontextmanager
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from fastapi import FastAPI
 from redis import asyncio as aioredis
+from common import http, leader, metrics
 import os
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     redis_url = os.environ["REDIS_URL"]
-    r = aioredis.from_url(redis_url, decode_responses=True)
+    r = metrics.InstrumentedRedis.from_url(redis_url, decode_responses=True)
     try:
         await r.ping()
     except aioredis.ConnectionError as e:
         raise RuntimeError(f"Failed to connect to Redis: {e}")
 
     app.state.redis = r
+    app.state.http = http.create_client()
+    app.state.leader = leader.LeaderLease(r, "scheduler")
+    app.state.leader.start()
+    app.state.scheduler = AsyncIOScheduler()
+    app.state.scheduler.start()
 
     try:
         yield
     finally:
+        app.state.scheduler.shutdown()
+        await app.state.leader.stop()
+        await app.state.http.aclose()
         await r.close()
         await r.connection_pool.disconnect(inuse_connections=True)
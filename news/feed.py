@@ -0,0 +1,101 @@
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from fastapi import HTTPException
+from redis import asyncio as aioredis
+from common.schemas import FeedItem, FeedPage, NewsItem
+from news import registry as news_registry
+from news.source import NewsSource
+
+
+FEED_KEY = "feed"
+TRACKING_PARAMS = {"fbclid", "gclid", "ref", "ref_src", "source", "mc_cid", "mc_eid"}
+
+_CURSOR = re.compile(r"^(-?\d+(?:\.\d+)?(?:e[+-]?\d+)?):(\d+)$")
+
+# Reads a page of the merged feed and, for each normalised URL, the item of the source that ranked it highest.
+# KEYS: feed, then every source's feed and items keys. ARGV: max score, offset, count, then the source weights.
+_FEED_PAGE_SCRIPT = """
+local members = redis.call('ZREVRANGEBYSCORE', KEYS[1], ARGV[1], '-inf', 'WITHSCORES', 'LIMIT', ARGV[2], ARGV[3])
+local result = {}
+for i = 1, #members, 2 do
+    local best, best_score = nil, nil
+    for s = 0, (#KEYS - 1) / 2 - 1 do
+        local score = redis.call('ZSCORE', KEYS[2 + s * 2], members[i])
+        if score and (best_score == nil or tonumber(score) * tonumber(ARGV[4 + s]) > best_score) then
+            best, best_score = s, tonumber(score) * tonumber(ARGV[4 + s])
+        end
+    end
+    if best ~= nil then
+        table.insert(result, redis.call('HGET', KEYS[3 + best * 2], members[i]))
+        table.insert(result, members[i + 1])
+    end
+end
+return result
+"""
+
+
+def normalize_url(url: str) -> str:
+    # The same story is linked with different schemes, hosts, tracking parameters and trailing slashes
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower().removeprefix("www.")
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS and not name.lower().startswith("utm_")
+    )
+    return urlunsplit(("", host, parts.path.rstrip("/"), urlencode(query), "")).removeprefix("//")
+
+
+async def sync_source(r: aioredis.Redis, source: NewsSource, items: list[tuple[NewsItem, float]]) -> None:
+    # Replaces the source's slice of the dedupe index and rebuilds the merged feed in the same transaction
+    scores: dict[str, float] = {}
+    members: dict[str, str] = {}
+    for item, score in items:
+        url = normalize_url(item.url)
+        if url not in scores or score > scores[url]:
+            scores[url] = score
+            members[url] = FeedItem(**item.model_dump(), source=source.name, score=score).model_dump_json()
+
+    sources = list(news_registry.SOURCES.values())
+    async with r.pipeline(transaction=True) as pipe:
+        pipe.delete(source.feed_key, source.feed_items_key)
+        if scores:
+            pipe.zadd(source.feed_key, scores)
+            pipe.hset(source.feed_items_key, mapping=members)
+        pipe.zunionstore(FEED_KEY, {s.feed_key: s.feed_weight for s in sources}, aggregate="MAX")
+        await pipe.execute()
+
+
+async def get_feed_page(r: aioredis.Redis, limit: int, cursor: str | None) -> FeedPage:
+    max_score, offset = _decode_cursor(cursor)
+    sources = list(news_registry.SOURCES.values())
+    keys = [FEED_KEY] + [key for s in sources for key in (s.feed_key, s.feed_items_key)]
+    args = [max_score, offset, limit + 1] + [s.feed_weight for s in sources]
+    result = await r.eval(_FEED_PAGE_SCRIPT, len(keys), *keys, *args)
+
+    # Scores travel as the strings Redis returned, so that the cursor matches them exactly
+    rows = [(result[i], result[i + 1]) for i in range(0, len(result), 2)]
+    items = [
+        FeedItem.model_validate_json(member).model_copy(update={"score": float(score)})
+        for member, score in rows[:limit]
+    ]
+    next_cursor = None
+    if len(rows) > limit:
+        last_score = rows[limit - 1][1]
+        ties = sum(1 for _, score in rows[:limit] if score == last_score)
+        if rows[0][1] == last_score and max_score != "+inf" and float(max_score) == float(last_score):
+            ties += offset  # the whole page shares the cursor's score
+        next_cursor = f"{last_score}:{ties}"
+    return FeedPage(items=items, next_cursor=next_cursor)
+
+
+def _decode_cursor(cursor: str | None) -> tuple[str, int]:
+    # A cursor is the score of the last returned item and how many items with that score were already returned
+    if cursor is None:
+        return "+inf", 0
+    match = _CURSOR.match(cursor)
+    if match is None:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    return match.group(1), int(match.group(2))
@@ -0,0 +1,105 @@
+import re
+from bs4 import BeautifulSoup, Tag as SoupTag
+from common import parsing
+from news.source import NewsSource, ParsedItem
+
+
+def _to_item(vote_id: str, title: str, url: str, points: str, comments: str) -> ParsedItem:
+    item_id = int(vote_id[4:])  # remove 'vote' prefix
+    points = int(points) if points else 0
+    comments = re.search(r"(\d+)", comments.strip())
+    comments = int(comments.group(1)) if comments else 0
+    return ParsedItem(id=item_id, title=title.strip(), url=url, points=points, comments=comments)
+
+
+def _parse_bs4(html: str) -> list[ParsedItem]:
+    soup = BeautifulSoup(html, "html.parser")
+
+    topic_elems = soup.select(".topics .topic_row")
+
+    return [_map_element(topic_elem) for topic_elem in topic_elems]
+
+
+def _map_element(topic_elem: SoupTag) -> ParsedItem:
+    return _to_item(
+        topic_elem.select_one(".vote > span")["id"],
+        topic_elem.select_one("h1").text,
+        topic_elem.select_one(".topictitle a")["href"],
+        topic_elem.select(".topicinfo span")[0].text,
+        topic_elem.select(".topicinfo a")[-1].text,
+    )
+
+
+def _parse_lxml(html: str) -> list[ParsedItem]:
+    document = parsing.lxml_document(html)
+
+    items = []
+    for topic_elem in document.xpath(f"//*[{parsing.xpath_class('topics')}]//*[{parsing.xpath_class('topic_row')}]"):
+        info_elem = topic_elem.xpath(f".//*[{parsing.xpath_class('topicinfo')}]")[0]
+        items.append(
+            _to_item(
+                topic_elem.xpath(f".//*[{parsing.xpath_class('vote')}]/span")[0].get("id"),
+                topic_elem.xpath(".//h1")[0].text_content(),
+                topic_elem.xpath(f".//*[{parsing.xpath_class('topictitle')}]//a")[0].get("href"),
+                info_elem.xpath(".//span")[0].text_content(),
+                info_elem.xpath(".//a")[-1].text_content(),
+            )
+        )
+    return items
+
+
+class _GeekNewsParser(parsing.ScopedHTMLParser):
+    scopes = ("topics", "topic_row", "vote", "topictitle", "topicinfo")
+
+    def __init__(self):
+        super().__init__()
+        self.topics: list[dict[str, str | None]] = []
+        self._field: str | None = None
+
+    def enter(self, name: str, attrs: dict[str, str | None]) -> None:
+        if name == "topic_row" and self.inside("topics"):
+            self.topics.append({"id": None, "title": None, "url": None, "points": None, "comments": None})
+
+    def start(self, tag: str, attrs: dict[str, str | None]) -> None:
+        if not self.inside("topic_row") or not self.topics:
+            return
+        topic = self.topics[-1]
+        if tag == "span" and self.inside("vote") and topic["id"] is None:
+            topic["id"] = attrs.get("id") or ""
+        elif tag == "h1" and topic["title"] is None:
+            self._start_field("title")
+        elif tag == "a" and self.inside("topictitle") and topic["url"] is None:
+            topic["url"] = attrs.get("href") or ""
+        elif tag == "span" and self.inside("topicinfo") and topic["points"] is None:
+            self._start_field("points")
+        elif tag == "a" and self.inside("topicinfo"):
+            self._start_field("comments")
+
+    def end(self, tag: str) -> None:
+        if self._field is not None and tag == {"title": "h1", "points": "span", "comments": "a"}[self._field]:
+            self.topics[-1][self._field] = self.captured()
+            self._field = None
+
+    def _start_field(self, field: str) -> None:
+        self._field = field
+        self.capture()
+
+
+def _parse_stdlib(html: str) -> list[ParsedItem]:
+    parser = _GeekNewsParser()
+    parser.feed(html)
+    parser.close()
+    return [
+        _to_item(topic["id"], topic["title"], topic["url"], topic["points"], topic["comments"] or "")
+        for topic in parser.topics
+    ]
+
+
+SOURCE = NewsSource(
+    name="geeknews",
+    title="GeekNews",
+    url="https://news.hada.io/",
+    page_query="page",
+    parsers={"lxml": _parse_lxml, "stdlib": _parse_stdlib, "bs4": _parse_bs4},
+    feed_weight=5.0,  # front page scores are about a fifth of HackerNews'
+)
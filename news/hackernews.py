@@ -0,0 +1,115 @@
+from bs4 import BeautifulSoup, Tag as SoupTag
+from common import parsing
+from news.source import NewsSource, ParsedItem
+
+
+def _to_item(item_id: str, title: str, url: str, points: str, comments: str) -> ParsedItem:
+    points = int(points.strip().split()[0]) if points.strip() else 0
+    comments = comments.strip()
+    comments = int(comments.split()[0]) if comments not in ["", "discuss"] else 0
+    return ParsedItem(id=int(item_id), title=title.strip(), url=url, points=points, comments=comments)
+
+
+def _parse_bs4(html: str) -> list[ParsedItem]:
+    soup = BeautifulSoup(html, "html.parser")
+
+    submission_elems = soup.select("tr.submission")
+    subtext_elems = soup.select("tr td.subtext")
+
+    return [
+        _map_element(submission_elem, subtext_elem)
+        for submission_elem, subtext_elem in zip(submission_elems, subtext_elems)
+    ]
+
+
+def _map_element(submission_elem: SoupTag, subtext_elem: SoupTag) -> ParsedItem:
+    title_elem = submission_elem.select_one(".title a")
+    points = subtext_elem.select_one(".score")
+    comments = subtext_elem.select(".subline a")
+    return _to_item(
+        submission_elem["id"],
+        title_elem.text,
+        title_elem["href"],
+        points.text if points else "",
+        comments[-1].text if comments else "",
+    )
+
+
+def _parse_lxml(html: str) -> list[ParsedItem]:
+    document = parsing.lxml_document(html)
+
+    submission_elems = document.xpath(f"//tr[{parsing.xpath_class('submission')}]")
+    subtext_elems = document.xpath(f"//tr/td[{parsing.xpath_class('subtext')}]")
+
+    items = []
+    for submission_elem, subtext_elem in zip(submission_elems, subtext_elems):
+        title_elem = submission_elem.xpath(f".//*[{parsing.xpath_class('title')}]//a")[0]
+        points = subtext_elem.xpath(f".//*[{parsing.xpath_class('score')}]")
+        comments = subtext_elem.xpath(f".//*[{parsing.xpath_class('subline')}]//a")
+        items.append(
+            _to_item(
+                submission_elem.get("id"),
+                title_elem.text_content(),
+                title_elem.get("href"),
+                points[0].text_content() if points else "",
+                comments[-1].text_content() if comments else "",
+            )
+        )
+    return items
+
+
+class _HackerNewsParser(parsing.ScopedHTMLParser):
+    scopes = ("submission", "title", "subtext", "score", "subline")
+
+    def __init__(self):
+        super().__init__()
+        self.submissions: list[dict[str, str]] = []
+        self.subtexts: list[dict[str, str]] = []
+
+    def enter(self, name: str, attrs: dict[str, str | None]) -> None:
+        if name == "submission":
+            self.submissions.append({"id": attrs["id"], "title": "", "url": ""})
+        elif name == "subtext":
+            self.subtexts.append({"points": "", "comments": ""})
+        elif name == "score" and self.inside("subtext"):
+            self.capture()
+
+    def leave(self, name: str) -> None:
+        if name == "score" and self.inside("subtext"):
+            self.subtexts[-1]["points"] = self.captured()
+
+    def start(self, tag: str, attrs: dict[str, str | None]) -> None:
+        if tag != "a":
+            return
+        if self.inside("submission") and self.inside("title") and not self.submissions[-1]["url"]:
+            self.submissions[-1]["url"] = attrs.get("href") or ""
+            self.capture()
+        elif self.inside("subtext") and self.inside("subline"):
+            self.capture()
+
+    def end(self, tag: str) -> None:
+        if tag != "a":
+            return
+        if self.inside("submission") and self.inside("title") and not self.submissions[-1]["title"]:
+            self.submissions[-1]["title"] = self.captured()
+        elif self.inside("subtext") and self.inside("subline"):
+            self.subtexts[-1]["comments"] = self.captured()
+
+
+def _parse_stdlib(html: str) -> list[ParsedItem]:
+    parser = _HackerNewsParser()
+    parser.feed(html)
+    parser.close()
+    return [
+        _to_item(submission["id"], submission["title"], submission["url"], subtext["points"], subtext["comments"])
+        for submission, subtext in zip(parser.submissions, parser.subtexts)
+    ]
+
+
+SOURCE = NewsSource(
+    name="hackernews",
+    title="HackerNews",
+    url="https://news.ycombinator.com/",
+    page_query="p",
+    parsers={"lxml": _parse_lxml, "stdlib": _parse_stdlib, "bs4": _parse_bs4},
+)
@@ -0,0 +1,30 @@
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from redis import asyncio as aioredis
+from common import scraping
+from news import pregenerate as news_pregenerate, registry as news_registry, service as news_service
+from news.source import NewsSource
+import httpx
+
+
+async def _scrape(r: aioredis.Redis, client: httpx.AsyncClient, source: NewsSource) -> float:
+    # Pre-generation runs after the scrape so that it sees the new top stories
+    churn = await news_service.scrap_items(r, client, source)
+    if news_pregenerate.PREGENERATE_PODCASTS:
+        try:
+            await news_pregenerate.pregenerate(r, source)
+        except Exception as e:
+            print(f"Error during podcast pre-generation ({source.name}): {e}")
+    return churn
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    for source in news_registry.SOURCES.values():
+        scraping.add_adaptive_job(
+            app.state.scheduler,
+            job_id=f"{source.name}-scrape",
+            func=app.state.leader.run_if_leader(_scrape),
+            args=[app.state.redis, app.state.http, source],
+        )
+    yield
@@ -0,0 +1,3 @@
+GET_SUCCESS = "{title} item retrieved successfully."
+FEED_GET_SUCCESS = "Feed retrieved successfully."
+PODCASTS_GET_SUCCESS = "{title} podcasts retrieved successfully."
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from redis import asyncio as aioredis
+from common import metrics
+from common.schemas import GeneratePodcastRequest
+from news import service as news_service
+from news.source import NewsSource
+from podcast import jobs as podcast_jobs, service as podcast_service
+
+
+PREGENERATE_PODCASTS = os.environ.get("PREGENERATE_PODCASTS", "false").lower() in ("1", "true", "yes")
+PREGENERATE_LIMIT = int(os.environ.get("PREGENERATE_LIMIT", "3"))
+PREGENERATE_TEXT_MODEL = os.environ.get("PREGENERATE_TEXT_MODEL", "gpt-4.1-mini")
+PREGENERATE_TTS_MODEL = os.environ.get("PREGENERATE_TTS_MODEL", "gemini-2.5-flash-tts")
+PREGENERATE_MAX_INFLIGHT = int(os.environ.get("PREGENERATE_MAX_INFLIGHT", "1"))
+PREGENERATE_DAILY_BUDGET = int(os.environ.get("PREGENERATE_DAILY_BUDGET", "24"))  # generated episodes per day
+
+PREGENERATE_INFLIGHT_KEY = "podcast:pregenerate:inflight"
+BUDGET_TTL_SECONDS = 86400 * 2  # 2 days
+
+RESULT_ENQUEUED = "enqueued"
+RESULT_REUSED = "reused"
+RESULT_ATTACHED = "attached"
+RESULT_UNCHANGED = "unchanged"
+RESULT_BUSY = "busy"
+RESULT_BUDGET = "budget"
+
+
+def _last_key(source: NewsSource) -> str:
+    return f"{source.name}:pregenerate:last"
+
+
+def _budget_key(day: str) -> str:
+    return f"podcast:pregenerate:budget:{day}"
+
+
+def _urls_hash(urls: list[str]) -> str:
+    return hashlib.sha256(json.dumps(sorted(urls)).encode()).hexdigest()
+
+
+async def pregenerate(r: aioredis.Redis, source: NewsSource) -> str | None:
+    request = GeneratePodcastRequest(
+        limit=PREGENERATE_LIMIT,
+        filenamePrefix=f"{source.name}_",
+        textModel=PREGENERATE_TEXT_MODEL,
+        ttsModel=PREGENERATE_TTS_MODEL,
+    )
+    urls = await news_service.get_top_item_urls(r, source, request.limit)
+    if not urls:
+        return None
+
+    # A failed episode is retried with the same stories, anything else with them already has one
+    urls_hash = _urls_hash(urls)
+    last = await r.hgetall(_last_key(source))
+    if (
+        last.get("urls_hash") == urls_hash
+        and await podcast_jobs.get_job_status(r, last["job_id"]) != podcast_service.STATUS_FAILED
+    ):
+        return _record(source, RESULT_UNCHANGED)
+
+    if await _count_inflight(r) >= PREGENERATE_MAX_INFLIGHT:
+        return _record(source, RESULT_BUSY)
+    budget_key = _budget_key(datetime.now().strftime("%Y%m%d"))
+    if int(await r.get(budget_key) or 0) >= PREGENERATE_DAILY_BUDGET:
+        return _record(source, RESULT_BUDGET)
+
+    job_id, enqueued = await podcast_jobs.enqueue_job(
+        r=r,
+        urls=urls,
+        **request.model_dump(exclude={"limit"}),
+        redis_key=source.podcasts_key,
+    )
+    await r.hset(_last_key(source), mapping={"urls_hash": urls_hash, "job_id": job_id})
+    # Only a generation started by this call is spent, an existing episode or a running job is free
+    if not enqueued:
+        if await podcast_jobs.get_job_status(r, job_id) == podcast_service.STATUS_COMPLETED:
+            return _record(source, RESULT_REUSED)
+        return _record(source, RESULT_ATTACHED)
+
+    async with r.pipeline(transaction=True) as pipe:
+        pipe.sadd(PREGENERATE_INFLIGHT_KEY, job_id)
+        pipe.incr(budget_key)
+        pipe.expire(budget_key, BUDGET_TTL_SECONDS)
+        await pipe.execute()
+    return _record(source, RESULT_ENQUEUED)
+
+
+async def _count_inflight(r: aioredis.Redis) -> int:
+    # Job ids are dropped from the set once their job finished or expired
+    job_ids = await r.smembers(PREGENERATE_INFLIGHT_KEY)
+    finished = []
+    for job_id in job_ids:
+        status = await podcast_jobs.get_job_status(r, job_id)
+        if status is None or status in podcast_jobs.TERMINAL_STATUSES:
+            finished.append(job_id)
+    if finished:
+        await r.srem(PREGENERATE_INFLIGHT_KEY, *finished)
+    return len(job_ids) - len(finished)
+
+
+def _record(source: NewsSource, result: str) -> str:
+    metrics.PODCAST_PREGENERATIONS.inc(source=source.name, result=result)
+    return result
@@ -0,0 +1,9 @@
+from news import geeknews, hackernews
+from news.source import NewsSource
+
+
+SOURCES: dict[str, NewsSource] = {source.name: source for source in (hackernews.SOURCE, geeknews.SOURCE)}
+
+
+def podcasts_keys() -> list[str]:
+    return [source.podcasts_key for source in SOURCES.values()]
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from common import cache
+from common.depends import get_redis
+from common.schemas import FeedPage, GeneratePodcastRequest, ResponseModel, NewsItem, PodcastMetadata
+from starlette import status
+from redis import asyncio as aioredis
+from news import feed as news_feed, lifespan as news_lifespan, messages as news_messages
+from news import registry as news_registry, service as news_service
+from news.source import NewsSource
+from podcast import jobs as podcast_jobs
+
+
+def create_router(source: NewsSource) -> APIRouter:
+    router = APIRouter(
+        prefix=f"/{source.name}",
+        tags=[source.title],
+    )
+
+    @router.get("/top", response_model=ResponseModel[list[NewsItem]], status_code=status.HTTP_200_OK)
+    async def get_top_items(
+        request: Request,
+        r: aioredis.Redis = Depends(get_redis),
+        limit: int = Query(gt=0, le=30, default=20),
+        page: int = Query(gt=0, default=1),
+    ):
+        cached = await news_service.get_top_items_page(r, source, limit, page)
+        return cache.page_response(request, cached, news_messages.GET_SUCCESS.format(title=source.title))
+
+    @router.get("/podcasts", response_model=ResponseModel[list[PodcastMetadata]], status_code=status.HTTP_200_OK)
+    async def get_podcasts(
+        request: Request,
+        r: aioredis.Redis = Depends(get_redis),
+        limit: int = Query(gt=0, le=30, default=20),
+        page: int = Query(gt=0, default=1),
+    ):
+        cached = await news_service.get_podcasts_page(r, source, limit, page)
+        return cache.page_response(request, cached, news_messages.PODCASTS_GET_SUCCESS.format(title=source.title))
+
+    @router.post("/podcasts/generate", status_code=status.HTTP_201_CREATED)
+    async def generate_podcast(request: GeneratePodcastRequest, r: aioredis.Redis = Depends(get_redis)):
+        urls = await news_service.get_top_item_urls(r, source, request.limit)
+        job_id, _ = await podcast_jobs.enqueue_job(
+            r=r,
+            urls=urls,
+            **request.model_dump(exclude={"limit"}),
+            redis_key=source.podcasts_key,
+        )
+        data = podcast_jobs.follow_job(r, job_id)
+        headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Job-Id": job_id}
+        return StreamingResponse(data, media_type="text/plain", headers=headers)
+
+    return router
+
+
+router = APIRouter(lifespan=news_lifespan.lifespan)
+for news_source in news_registry.SOURCES.values():
+    router.include_router(create_router(news_source))
+
+
+@router.get("/feed", response_model=ResponseModel[FeedPage], tags=["Feed"], status_code=status.HTTP_200_OK)
+async def get_feed(
+    r: aioredis.Redis = Depends(get_redis),
+    limit: int = Query(gt=0, le=50, default=20),
+    cursor: str | None = Query(default=None, max_length=64, description="nextCursor of the previous page"),
+):
+    feed_page = await news_feed.get_feed_page(r, limit, cursor)
+    return ResponseModel(
+        data=feed_page,
+        message=news_messages.FEED_GET_SUCCESS,
+    )
@@ -0,0 +1,54 @@
+from redis import asyncio as aioredis
+from common.schemas import NewsItem
+from common import cache, metrics, parsing, scraping, store
+from news import feed as news_feed
+from news.source import NewsSource
+from podcast import metadata as podcast_metadata
+import asyncio
+import httpx
+
+
+async def get_top_items(r: aioredis.Redis, source: NewsSource, limit: int, page: int) -> list[NewsItem]:
+    start, end = (page - 1) * limit, page * limit - 1
+    redis_data = await r.zrevrange(source.items_key, start, end)
+    items = list(map(lambda item: NewsItem.model_validate_json(item), redis_data))
+    return items
+
+
+async def get_top_item_urls(r: aioredis.Redis, source: NewsSource, limit: int) -> list[str]:
+    items = await get_top_items(r, source, limit, 1)
+    return [item.url for item in items]
+
+
+async def get_top_items_page(r: aioredis.Redis, source: NewsSource, limit: int, page: int) -> cache.CachedPage:
+    return await cache.get_page(r, source.items_key, limit, page)
+
+
+async def get_podcasts_page(r: aioredis.Redis, source: NewsSource, limit: int, page: int) -> cache.CachedPage:
+    return await cache.get_page(r, source.podcasts_key, limit, page, load=podcast_metadata.load_metadata_json)
+
+
+async def parse_items(source: NewsSource, html: str, backend: str | None = None) -> list[tuple[NewsItem, float]]:
+    parsed_items = await parsing.parse(source.parsers, html, backend)
+    return [(NewsItem(id=item.id, title=item.title, url=item.url), source.score(item)) for item in parsed_items]
+
+
+async def scrap_items(r: aioredis.Redis, client: httpx.AsyncClient, source: NewsSource) -> float:
+    with metrics.timed(metrics.SCRAPE_SECONDS, "scrape", source=source.name):
+        pages = await scraping.fetch_pages(client, source.page_urls(scraping.SCRAPE_PAGES))
+        if pages is None:
+            return 0.0
+
+        # Items move between pages while they are fetched, keep the first occurrence
+        parsed: dict[str, tuple[NewsItem, float]] = {}
+        for page_items in await asyncio.gather(*[parse_items(source, html) for html in pages]):
+            for item, score in page_items:
+                parsed.setdefault(str(item.id), (item, score))
+        metrics.SCRAPE_ITEMS.set(len(parsed), source=source.name)
+        if not parsed:
+            return 0.0
+
+        items = {item_id: (item.model_dump_json(), score) for item_id, (item, score) in parsed.items()}
+        changes = await store.sync_sorted_set(r, source.items_key, items)
+        await news_feed.sync_source(r, source, list(parsed.values()))
+        return changes / len(items)
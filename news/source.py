@@ -0,0 +1,45 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ParsedItem:
+    id: int
+    title: str
+    url: str
+    points: int
+    comments: int
+
+
+def points_and_comments(item: ParsedItem) -> float:
+    return item.points + item.comments * 0.5
+
+
+@dataclass(frozen=True, eq=False)
+class NewsSource:
+    name: str  # URL prefix of the routes and namespace of the Redis keys
+    title: str
+    url: str
+    page_query: str  # query parameter selecting the following front pages
+    parsers: dict[str, Callable[[str], list[ParsedItem]]]  # parser backend -> parse function
+    score: Callable[[ParsedItem], float] = points_and_comments
+    feed_weight: float = 1.0  # scales scores into the merged feed, so that sources of different sizes compare
+
+    @property
+    def items_key(self) -> str:
+        return f"{self.name}:items"
+
+    @property
+    def podcasts_key(self) -> str:
+        return f"{self.name}:podcasts"
+
+    @property
+    def feed_key(self) -> str:
+        return f"{self.name}:feed"
+
+    @property
+    def feed_items_key(self) -> str:
+        return f"{self.name}:feed:items"
+
+    def page_urls(self, pages: int) -> list[str]:
+        return [self.url] + [f"{self.url}?{self.page_query}={page}" for page in range(2, pages + 1)]
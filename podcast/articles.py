@@ -0,0 +1,199 @@
+import asyncio
+import hashlib
+import os
+import re
+from html.parser import HTMLParser
+import httpx
+from redis import asyncio as aioredis
+from common import http, metrics
+from podcast import clients
+
+
+ARTICLE_FETCH_CONCURRENCY = int(os.environ.get("ARTICLE_FETCH_CONCURRENCY", "8"))
+ARTICLE_TOKEN_BUDGET = int(os.environ.get("ARTICLE_TOKEN_BUDGET", "3000"))
+ARTICLE_TTL_SECONDS = 86400 * 3  # 3 days
+ARTICLE_MAX_BYTES = 2_000_000
+ARTICLE_MAX_REDIRECTS = 5
+ARTICLE_MIN_CHARS = 200  # shorter extractions are treated as unreadable pages
+ARTICLE_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+BYTES_PER_TOKEN = 4  # rough UTF-8 bytes per model token, no tokenizer is required
+
+_SKIPPED_TAGS = {"script", "style", "noscript", "svg", "template", "iframe", "nav", "header", "footer", "aside", "form"}
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+_BLOCK_TAGS = {
+    "address", "article", "blockquote", "br", "dd", "div", "dl", "dt", "figcaption", "h1", "h2", "h3", "h4", "h5",
+    "h6", "hr", "li", "main", "ol", "p", "pre", "section", "table", "td", "th", "tr", "ul",
+}  # fmt: skip
+_HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+_CONTENT_TAGS = {"article", "main"}
+_MIN_PARAGRAPH_CHARS = 40  # drops menus, bylines and button labels, headings are always kept
+_WHITESPACE = re.compile(r"\s+")
+
+_semaphore = asyncio.Semaphore(ARTICLE_FETCH_CONCURRENCY)
+
+
+def _article_key(url: str) -> str:
+    return f"podcast:article:{hashlib.sha256(url.encode()).hexdigest()}"
+
+
+async def fetch_articles(r: aioredis.Redis, urls: list[str]) -> list[str | None]:
+    # Readable text of each article trimmed to the token budget, None where it could not be extracted
+    results = await asyncio.gather(*[_fetch_article(r, url) for url in urls], return_exceptions=True)
+    articles = []
+    for url, result in zip(urls, results):
+        if isinstance(result, Exception):
+            print(f"Error during article fetch ({url}): {result}")
+            result = None
+        articles.append(result)
+    return articles
+
+
+async def _fetch_article(r: aioredis.Redis, url: str) -> str | None:
+    key = _article_key(url)
+    cached = await r.hgetall(key)
+    headers = http.validator_headers(cached.get("etag"), cached.get("last_modified")) if cached else {}
+    async with _semaphore:
+        res, body = await _download(url, headers)
+
+    if res.status_code == httpx.codes.NOT_MODIFIED and cached:
+        metrics.record_cache("article", hit=True)
+        await r.expire(key, ARTICLE_TTL_SECONDS)
+        return cached["text"] or None
+
+    metrics.record_cache("article", hit=False)
+    text = None
+    if body is not None:
+        page = body.decode(res.encoding or "utf-8", errors="replace")
+        text = await asyncio.to_thread(_readable_text, _content_type(res), page)
+    async with r.pipeline(transaction=True) as pipe:
+        pipe.delete(key)
+        pipe.hset(
+            key,
+            mapping={
+                "text": text or "",
+                "etag": res.headers.get("ETag", ""),
+                "last_modified": res.headers.get("Last-Modified", ""),
+            },
+        )
+        pipe.expire(key, ARTICLE_TTL_SECONDS)
+        await pipe.execute()
+    return text
+
+
+async def _download(url: str, headers: dict[str, str]) -> tuple[httpx.Response, bytes | None]:
+    # Redirects are followed by hand so that every hop is checked, bodies that are not readable pages are never read
+    request_url = httpx.URL(url)
+    for _ in range(ARTICLE_MAX_REDIRECTS + 1):
+        async with http.stream_public(clients.get_http_client(), request_url, headers) as res:
+            if res.has_redirect_location:
+                request_url = request_url.join(res.headers["Location"])
+                continue
+            if res.status_code == httpx.codes.NOT_MODIFIED:
+                return res, None
+            res.raise_for_status()
+            if _content_type(res) not in ARTICLE_CONTENT_TYPES:
+                return res, None
+            if int(res.headers.get("Content-Length") or 0) > ARTICLE_MAX_BYTES:
+                return res, None
+
+            body = bytearray()
+            async for chunk in res.aiter_bytes():
+                body += chunk
+                if len(body) > ARTICLE_MAX_BYTES:
+                    return res, None
+            return res, bytes(body)
+    raise httpx.TooManyRedirects(f"Exceeded {ARTICLE_MAX_REDIRECTS} redirects fetching '{url}'.")
+
+
+def _content_type(res: httpx.Response) -> str:
+    return res.headers.get("Content-Type", "text/html").split(";")[0].strip().lower()
+
+
+def _readable_text(content_type: str, page: str) -> str | None:
+    text = page if content_type == "text/plain" else extract_text(page)
+    if len(text) < ARTICLE_MIN_CHARS:
+        return None
+    return trim_to_budget(text, ARTICLE_TOKEN_BUDGET)
+
+
+def extract_text(html: str) -> str:
+    parser = _ArticleTextParser()
+    parser.feed(html)
+    parser.close()
+    return "\n\n".join(parser.paragraphs())
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text.encode()) // BYTES_PER_TOKEN)
+
+
+def trim_to_budget(text: str, tokens: int) -> str:
+    budget = tokens * BYTES_PER_TOKEN
+    kept, used = [], 0
+    for paragraph in text.split("\n\n"):
+        size = len(paragraph.encode()) + 2
+        if used + size > budget:
+            if not kept:  # a single oversized paragraph is cut at the byte budget
+                kept.append(paragraph.encode()[:budget].decode(errors="ignore"))
+            break
+        kept.append(paragraph)
+        used += size
+    return "\n\n".join(kept)
+
+
+class _ArticleTextParser(HTMLParser):
+    # Collects text blocks, preferring those inside <article>/<main> when the page has any
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._skipped: list[str] = []
+        self._content_depth = 0
+        self._heading = False
+        self._buffer: list[str] = []
+        self._blocks: list[tuple[str, bool, bool]] = []  # text, inside content, heading
+
+    def paragraphs(self) -> list[str]:
+        self._flush()
+        in_content = any(content for _, content, _ in self._blocks)
+        return [
+            text
+            for text, content, heading in self._blocks
+            if (content or not in_content) and (heading or len(text) >= _MIN_PARAGRAPH_CHARS)
+        ]
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in _VOID_TAGS:
+            if tag in _BLOCK_TAGS and not self._skipped:
+                self._flush()
+            return
+        if self._skipped or tag in _SKIPPED_TAGS:
+            self._skipped.append(tag)
+            return
+        if tag in _BLOCK_TAGS:
+            self._flush()
+        if tag in _CONTENT_TAGS:
+            self._content_depth += 1
+        if tag in _HEADING_TAGS:
+            self._heading = True
+
+    def handle_endtag(self, tag: str) -> None:
+        if self._skipped:
+            if tag in self._skipped:
+                while self._skipped.pop() != tag:
+                    pass
+            return
+        if tag in _BLOCK_TAGS:
+            self._flush()
+        if tag in _CONTENT_TAGS and self._content_depth:
+            self._content_depth -= 1
+        if tag in _HEADING_TAGS:
+            self._heading = False
+
+    def handle_data(self, data: str) -> None:
+        if not self._skipped:
+            self._buffer.append(data)
+
+    def _flush(self) -> None:
+        text = _WHITESPACE.sub(" ", "".join(self._buffer)).strip()
+        self._buffer = []
+        if text:
+            self._blocks.append((text, self._content_depth > 0, self._heading))
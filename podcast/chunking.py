@@ -0,0 +1,115 @@
+import math
+import re
+
+
+TTS_MAX_CHUNK_BYTES = 4000
+TTS_MIN_CHUNK_BYTES = 500
+ENCODING = "utf-8"
+
+_SPEAKER_PATTERN = re.compile(r"^\s*(진행자\s*[12]\s*:)")
+_SENTENCE_PATTERN = re.compile(r"(?<=[.!?…。])\s+")
+
+
+def split_turns(text: str) -> list[str]:
+    turns: list[str] = []
+    for line in text.splitlines(keepends=True):
+        if turns and not _SPEAKER_PATTERN.match(line):
+            turns[-1] += line
+        else:
+            turns.append(line)
+    return turns
+
+
+def partition(text: str, max_bytes: int = TTS_MAX_CHUNK_BYTES, parallelism: int = 1) -> list[str]:
+    units = [unit for turn in split_turns(text) for unit in _split_long_turn(turn, max_bytes, TTS_MIN_CHUNK_BYTES * 2)]
+    if not units:
+        return []
+
+    # Chunks are synthesised `parallelism` at a time, so use whole waves of equally sized chunks
+    sizes = [size(unit) for unit in units]
+    total = sum(sizes)
+    parts = math.ceil(math.ceil(total / max_bytes) / parallelism) * parallelism
+    parts = max(min(parts, total // TTS_MIN_CHUNK_BYTES, len(units)), math.ceil(total / max_bytes))
+
+    # Smallest chunk size limit that still packs the units into `parts` contiguous chunks
+    low, high = max(sizes), max_bytes
+    while low < high:
+        limit = (low + high) // 2
+        if len(_pack(sizes, limit)) <= parts:
+            high = limit
+        else:
+            low = limit + 1
+
+    return ["".join(units[start:end]) for start, end in _pack(sizes, low)]
+
+
+def _pack(sizes: list[int], limit: int) -> list[tuple[int, int]]:
+    bounds: list[tuple[int, int]] = []
+    start, current = 0, 0
+    for i, unit_size in enumerate(sizes):
+        if current + unit_size > limit and i > start:
+            bounds.append((start, i))
+            start, current = i, 0
+        current += unit_size
+    bounds.append((start, len(sizes)))
+    return bounds
+
+
+def _split_long_turn(turn: str, max_bytes: int, piece_bytes: int) -> list[str]:
+    if size(turn) <= max_bytes:
+        return [turn]
+
+    match = _SPEAKER_PATTERN.match(turn)
+    speaker = f"{match.group(1)} " if match else ""
+    body = turn[match.end() :].strip() if match else turn.strip()
+    body_max_bytes = min(max_bytes, piece_bytes) - size(speaker) - 1
+
+    pieces: list[str] = []
+    current = ""
+    for sentence in _split_sentences(body, body_max_bytes):
+        candidate = f"{current} {sentence}" if current else sentence
+        if size(candidate) > body_max_bytes:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = candidate
+    if current:
+        pieces.append(current)
+
+    return [f"{speaker}{piece}\n" for piece in pieces]
+
+
+def _split_sentences(text: str, max_bytes: int) -> list[str]:
+    sentences: list[str] = []
+    for sentence in _SENTENCE_PATTERN.split(text):
+        if size(sentence) <= max_bytes:
+            sentences.append(sentence)
+        else:
+            sentences.extend(_split_words(sentence, max_bytes))
+    return sentences
+
+
+def _split_words(text: str, max_bytes: int) -> list[str]:
+    pieces: list[str] = []
+    current = ""
+    for word in text.split():
+        while size(word) > max_bytes:
+            if current:
+                pieces.append(current)
+                current = ""
+            cut = len(word.encode(ENCODING)[:max_bytes].decode(ENCODING, errors="ignore"))
+            pieces.append(word[:cut])
+            word = word[cut:]
+        candidate = f"{current} {word}" if current else word
+        if size(candidate) > max_bytes:
+            pieces.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def size(text: str) -> int:
+    return len(text.encode(ENCODING))
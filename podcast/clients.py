@@ -0,0 +1,47 @@
+from google.cloud import texttospeech
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+import httpx
+from common import http
+
+
+OPENAI_TIMEOUT = httpx.Timeout(300.0, connect=10.0)
+OPENAI_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=60.0)
+
+_oai_client: AsyncOpenAI | None = None
+_tts_client: texttospeech.TextToSpeechAsyncClient | None = None
+_http_client: httpx.AsyncClient | None = None
+
+
+def get_oai_client() -> AsyncOpenAI:
+    global _oai_client
+    if _oai_client is None:
+        http_client = DefaultAsyncHttpxClient(timeout=OPENAI_TIMEOUT, limits=OPENAI_LIMITS)
+        _oai_client = AsyncOpenAI(http_client=http_client)
+    return _oai_client
+
+
+def get_tts_client() -> texttospeech.TextToSpeechAsyncClient:
+    global _tts_client
+    if _tts_client is None:
+        _tts_client = texttospeech.TextToSpeechAsyncClient()
+    return _tts_client
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None:
+        _http_client = http.create_client()
+    return _http_client
+
+
+async def close_clients() -> None:
+    global _oai_client, _tts_client, _http_client
+    if _oai_client is not None:
+        await _oai_client.close()
+        _oai_client = None
+    if _tts_client is not None:
+        await _tts_client.transport.close()
+        _tts_client = None
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
@@ -0,0 +1,193 @@
+import asyncio
+import os
+import time
+import uuid
+from email.utils import formatdate, parsedate_to_datetime
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+from starlette import status
+
+
+PODCASTS_DIR = os.path.join("output", "podcasts")
+PODCAST_CACHE_CONTROL = "public, max-age=31536000, immutable"
+STAT_INDEX_TTL_SECONDS = 60
+
+# Layer III bitrates (kbps) by MPEG-1 flag, and sample rates (Hz) by version bits
+_MP3_BITRATES = {
+    True: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    False: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+# filename -> (stat result, cached at)
+_stat_index: dict[str, tuple[os.stat_result, float]] = {}
+
+
+class AudioFileWriter:
+    def __init__(self, output_path: str):
+        self.output_path = output_path
+        self.tmp_path = f"{output_path}.{uuid.uuid4().hex}.tmp"
+        self._file = None
+        self._next_index = 0
+        self._reorder_buffer: dict[int, bytes] = {}
+        self.byte_size = 0
+        self.duration_seconds = 0.0
+
+    @property
+    def next_index(self) -> int:
+        return self._next_index
+
+    async def write(self, index: int, audio: bytes) -> None:
+        self.byte_size += len(audio)
+        self.duration_seconds += mp3_duration(audio)
+        self._reorder_buffer[index] = audio
+        while self._next_index in self._reorder_buffer:
+            data = self._reorder_buffer.pop(self._next_index)
+            await asyncio.to_thread(self._write, data)
+            self._next_index += 1
+
+    async def commit(self) -> None:
+        if self._reorder_buffer:
+            raise RuntimeError(f"Audio chunk {self._next_index} was never written.")
+        await asyncio.to_thread(self._commit)
+
+    async def abort(self) -> None:
+        self._reorder_buffer.clear()
+        await asyncio.to_thread(self._abort)
+
+    def _write(self, data: bytes) -> None:
+        if self._file is None:
+            self._file = open(self.tmp_path, "wb")
+        self._file.write(data)
+
+    def _commit(self) -> None:
+        if self._file is None:
+            self._file = open(self.tmp_path, "wb")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.tmp_path, self.output_path)
+        _fsync_dir(os.path.dirname(self.output_path))
+
+    def _abort(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def mp3_duration(data: bytes) -> float:
+    offset = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        offset = 10 + ((data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F))
+
+    duration = 0.0
+    while offset + 4 <= len(data):
+        b1, b2 = data[offset + 1], data[offset + 2]
+        version, layer = (b1 >> 3) & 0x3, (b1 >> 1) & 0x3
+        bitrate_index, rate_index, padding = b2 >> 4, (b2 >> 2) & 0x3, (b2 >> 1) & 0x1
+        if (
+            data[offset] != 0xFF
+            or b1 & 0xE0 != 0xE0
+            or version == 1
+            or layer != 1
+            or bitrate_index in (0, 15)
+            or rate_index == 3
+        ):
+            offset += 1
+            continue
+
+        mpeg1 = version == 3
+        samples = 1152 if mpeg1 else 576
+        bitrate = _MP3_BITRATES[mpeg1][bitrate_index] * 1000
+        sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+        duration += samples / sample_rate
+        offset += samples // 8 * bitrate // sample_rate + padding
+    return duration
+
+
+async def stat_podcast_file(filename: str, cached: bool = True) -> os.stat_result | None:
+    entry = _stat_index.get(filename) if cached else None
+    if entry is not None and time.monotonic() - entry[1] < STAT_INDEX_TTL_SECONDS:
+        return entry[0]
+
+    try:
+        stat_result = await asyncio.to_thread(os.stat, os.path.join(PODCASTS_DIR, filename))
+    except FileNotFoundError:
+        _stat_index.pop(filename, None)
+        return None
+    _stat_index[filename] = (stat_result, time.monotonic())
+    return stat_result
+
+
+def forget_podcast_file(filename: str) -> None:
+    _stat_index.pop(filename, None)
+
+
+async def remove_podcast_file(filename: str) -> None:
+    forget_podcast_file(filename)
+    try:
+        await asyncio.to_thread(os.remove, os.path.join(PODCASTS_DIR, filename))
+    except FileNotFoundError:
+        pass
+
+
+def podcast_file_response(
+    request: Request,
+    filename: str,
+    stat_result: os.stat_result,
+    media_type: str,
+    content_disposition_type: str = "attachment",
+) -> Response:
+    headers = {
+        "ETag": f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"',
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "Cache-Control": PODCAST_CACHE_CONTROL,
+    }
+    if _is_not_modified(request, headers["ETag"], stat_result.st_mtime):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return FileResponse(
+        path=os.path.join(PODCASTS_DIR, filename),
+        headers=headers,
+        media_type=media_type,
+        filename=filename,
+        stat_result=stat_result,
+        content_disposition_type=content_disposition_type,
+    )
+
+
+def _is_not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("If-Modified-Since")
+    if if_modified_since is None:
+        return False
+    try:
+        return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+async def write_text_atomic(text: str, output_path: str) -> None:
+    def _call():
+        tmp_path = f"{output_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as out:
+            out.write(text)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, output_path)
+        _fsync_dir(os.path.dirname(output_path))
+
+    await asyncio.to_thread(_call)
+
+
+def _fsync_dir(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
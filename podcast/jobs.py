@@ -0,0 +1,248 @@
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import uuid
+from collections.abc import AsyncGenerator
+from datetime import datetime
+from fastapi import HTTPException
+from redis import asyncio as aioredis
+from common import metrics, store
+from common.schemas import PodcastJob
+from podcast import files as podcast_files, metadata as podcast_metadata, service as podcast_service
+
+
+PODCAST_JOBS_STREAM = "podcast:jobs"
+PODCAST_JOBS_GROUP = "podcast-workers"
+PODCAST_WORKERS = int(os.environ.get("PODCAST_WORKERS", "2"))
+
+JOB_TTL_SECONDS = 86400  # 1 day
+JOB_MAX_ATTEMPTS = 3
+JOB_CLAIM_IDLE_MS = 60_000
+JOB_HEARTBEAT_SECONDS = 15
+JOB_READ_BLOCK_MS = 5_000
+JOBS_STREAM_MAXLEN = 10_000
+
+TERMINAL_STATUSES = {podcast_service.STATUS_COMPLETED, podcast_service.STATUS_FAILED}
+
+
+def _job_key(job_id: str) -> str:
+    return f"podcast:job:{job_id}"
+
+
+def _events_key(job_id: str) -> str:
+    return f"podcast:job:{job_id}:events"
+
+
+def _inflight_key(content_key: str) -> str:
+    return f"podcast:inflight:{content_key}"
+
+
+def _content_store_key(content_key: str) -> str:
+    return f"podcast:content:{content_key}"
+
+
+def _content_key(urls: list[str], text_model: str, tts_model: str, redis_key: str) -> str:
+    # Episodes are reused within a source only, eviction unlists them from the set of the source that owns them
+    payload = json.dumps([sorted(urls), text_model, tts_model, redis_key])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+async def enqueue_job(
+    r: aioredis.Redis,
+    urls: list[str],
+    text_model: str,
+    tts_model: str,
+    filename_prefix: str,
+    redis_key: str,
+) -> tuple[str, bool]:
+    # Returns the job id and whether this call queued a new generation
+    job_id = uuid.uuid4().hex
+    timestamp = int(datetime.now().timestamp())
+    content_key = _content_key(urls, text_model, tts_model, redis_key)
+    job = {
+        "status": podcast_service.STATUS_PENDING,
+        "urls": json.dumps(urls),
+        "text_model": text_model,
+        "tts_model": tts_model,
+        # Jobs enqueued in the same second must not share their files
+        "filename": f"{filename_prefix}{timestamp}_{job_id[:8]}",
+        "redis_key": redis_key,
+        "content_key": content_key,
+        "attempts": 0,
+    }
+
+    filename = await _get_stored_filename(r, content_key)
+    metrics.record_cache("podcast", hit=filename is not None)
+    if filename is not None:
+        job |= {"status": podcast_service.STATUS_COMPLETED, "filename": filename}
+        await store.add_to_sorted_set(r, redis_key, {filename: timestamp})
+        await _create_job(r, job_id, job, enqueue=False)
+        return job_id, False
+
+    if not await r.set(_inflight_key(content_key), job_id, nx=True, ex=JOB_TTL_SECONDS):
+        inflight_job_id = await r.get(_inflight_key(content_key))
+        if inflight_job_id is not None:
+            return inflight_job_id, False
+
+    await _create_job(r, job_id, job, enqueue=True)
+    return job_id, True
+
+
+async def _get_stored_filename(r: aioredis.Redis, content_key: str) -> str | None:
+    filename = await r.get(_content_store_key(content_key))
+    if filename is None:
+        return None
+    # Another process may have evicted the podcast, its cached stat result cannot be trusted here
+    if await podcast_files.stat_podcast_file(f"{filename}.mp3", cached=False) is None:
+        await r.delete(_content_store_key(content_key))
+        return None
+    return filename
+
+
+async def _create_job(r: aioredis.Redis, job_id: str, job: dict, enqueue: bool) -> None:
+    async with r.pipeline(transaction=True) as pipe:
+        pipe.hset(_job_key(job_id), mapping=job)
+        pipe.expire(_job_key(job_id), JOB_TTL_SECONDS)
+        pipe.xadd(_events_key(job_id), {"status": job["status"]})
+        pipe.expire(_events_key(job_id), JOB_TTL_SECONDS)
+        if enqueue:
+            pipe.xadd(PODCAST_JOBS_STREAM, {"job_id": job_id}, maxlen=JOBS_STREAM_MAXLEN, approximate=True)
+        await pipe.execute()
+
+
+async def get_job(r: aioredis.Redis, job_id: str) -> PodcastJob:
+    job = await r.hgetall(_job_key(job_id))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return PodcastJob(
+        id=job_id, status=job["status"], filename=job["filename"], done=job.get("done"), total=job.get("total")
+    )
+
+
+async def get_job_status(r: aioredis.Redis, job_id: str) -> str | None:
+    return await r.hget(_job_key(job_id), "status")
+
+
+async def follow_job(r: aioredis.Redis, job_id: str) -> AsyncGenerator[str, None]:
+    last_status = None
+    async for event in _read_events(r, job_id):
+        if event["status"] != last_status:
+            last_status = event["status"]
+            yield last_status
+
+
+async def follow_job_events(r: aioredis.Redis, job_id: str) -> AsyncGenerator[str, None]:
+    last_status = None
+    async for event in _read_events(r, job_id):
+        if event["status"] != last_status:
+            last_status = event["status"]
+            yield f"event: status\ndata: {last_status}\n\n"
+        if "done" in event:
+            progress = {"done": int(event["done"]), "total": int(event["total"])}
+            yield f"event: progress\ndata: {json.dumps(progress)}\n\n"
+
+
+async def _read_events(r: aioredis.Redis, job_id: str) -> AsyncGenerator[dict[str, str], None]:
+    last_id = "0"
+    while True:
+        res = await r.xread({_events_key(job_id): last_id}, block=JOB_READ_BLOCK_MS)
+        if not res:
+            if not await r.exists(_job_key(job_id)):
+                return
+            continue
+
+        for last_id, event in res[0][1]:
+            yield event
+            if event["status"] in TERMINAL_STATUSES:
+                return
+
+
+async def run_worker(r: aioredis.Redis, consumer: str) -> None:
+    await _ensure_group(r)
+    while True:
+        try:
+            messages = await _claim_stale(r, consumer) or await _read_new(r, consumer)
+            for message_id, fields in messages:
+                await _process(r, consumer, message_id, fields["job_id"])
+        except aioredis.RedisError as e:
+            print(f"Error in podcast worker {consumer}: {e}")
+            await asyncio.sleep(1)
+
+
+async def _ensure_group(r: aioredis.Redis) -> None:
+    try:
+        await r.xgroup_create(PODCAST_JOBS_STREAM, PODCAST_JOBS_GROUP, id="0", mkstream=True)
+    except aioredis.ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+async def _claim_stale(r: aioredis.Redis, consumer: str) -> list:
+    _, messages, *_ = await r.xautoclaim(
+        PODCAST_JOBS_STREAM, PODCAST_JOBS_GROUP, consumer, min_idle_time=JOB_CLAIM_IDLE_MS, count=1
+    )
+    return messages
+
+
+async def _read_new(r: aioredis.Redis, consumer: str) -> list:
+    res = await r.xreadgroup(PODCAST_JOBS_GROUP, consumer, {PODCAST_JOBS_STREAM: ">"}, count=1, block=JOB_READ_BLOCK_MS)
+    return res[0][1] if res else []
+
+
+async def _process(r: aioredis.Redis, consumer: str, message_id: str, job_id: str) -> None:
+    job = await r.hgetall(_job_key(job_id))
+    if job:
+        attempts = await r.hincrby(_job_key(job_id), "attempts", 1)
+        if attempts > JOB_MAX_ATTEMPTS:
+            await _set_status(r, job_id, podcast_service.STATUS_FAILED)
+            await store.delete_if_equal(r, _inflight_key(job["content_key"]), job_id)
+        else:
+            await _run_job(r, consumer, message_id, job_id, job)
+    await r.xack(PODCAST_JOBS_STREAM, PODCAST_JOBS_GROUP, message_id)
+
+
+async def _run_job(r: aioredis.Redis, consumer: str, message_id: str, job_id: str, job: dict[str, str]) -> None:
+    heartbeat = asyncio.create_task(_heartbeat(r, consumer, message_id))
+    status = podcast_service.STATUS_PENDING
+    try:
+        async for status in podcast_service.generate_podcast(
+            r=r,
+            urls=json.loads(job["urls"]),
+            text_model=job["text_model"],
+            tts_model=job["tts_model"],
+            filename=job["filename"],
+            redis_key=job["redis_key"],
+            on_progress=functools.partial(_set_progress, r, job_id),
+        ):
+            await _set_status(r, job_id, status)
+    finally:
+        heartbeat.cancel()
+
+    if status == podcast_service.STATUS_COMPLETED:
+        await r.set(_content_store_key(job["content_key"]), job["filename"])
+        await podcast_metadata.set_content_store_key(r, job["filename"], _content_store_key(job["content_key"]))
+    await store.delete_if_equal(r, _inflight_key(job["content_key"]), job_id)
+
+
+async def _heartbeat(r: aioredis.Redis, consumer: str, message_id: str) -> None:
+    while True:
+        await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+        await r.xclaim(PODCAST_JOBS_STREAM, PODCAST_JOBS_GROUP, consumer, 0, [message_id], justid=True)
+
+
+async def _set_status(r: aioredis.Redis, job_id: str, status: str) -> None:
+    async with r.pipeline(transaction=True) as pipe:
+        pipe.hset(_job_key(job_id), "status", status)
+        pipe.xadd(_events_key(job_id), {"status": status})
+        await pipe.execute()
+
+
+async def _set_progress(r: aioredis.Redis, job_id: str, done: int, total: int) -> None:
+    # Chunk progress travels next to the status, which stays one of the STATUS_* values
+    progress = {"done": done, "total": total}
+    async with r.pipeline(transaction=True) as pipe:
+        pipe.hset(_job_key(job_id), mapping=progress)
+        pipe.xadd(_events_key(job_id), {"status": podcast_service.STATUS_GENERATING_AUDIO} | progress)
+        await pipe.execute()
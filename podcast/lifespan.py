@@ -0,0 +1,31 @@
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from podcast import clients as podcast_clients, jobs as podcast_jobs, retention as podcast_retention
+from podcast import search as podcast_search
+import asyncio
+import os
+import socket
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    consumer_prefix = f"{socket.gethostname()}-{os.getpid()}"
+    workers = [
+        asyncio.create_task(podcast_jobs.run_worker(app.state.redis, f"{consumer_prefix}-{i}"))
+        for i in range(podcast_jobs.PODCAST_WORKERS)
+    ]
+    backfill = asyncio.create_task(podcast_search.backfill())
+    evictions = asyncio.create_task(podcast_retention.watch_evictions(app.state.redis))
+    app.state.scheduler.add_job(
+        func=app.state.leader.run_if_leader(podcast_retention.enforce_retention),
+        trigger="interval",
+        seconds=podcast_retention.RETENTION_INTERVAL_SECONDS,
+        args=[app.state.redis],
+    )
+    try:
+        yield
+    finally:
+        for task in [*workers, backfill, evictions]:
+            task.cancel()
+        await asyncio.gather(*workers, backfill, evictions, return_exceptions=True)
+        await podcast_clients.close_clients()
@@ -0,0 +1,3 @@
+JOB_GET_SUCCESS = "Podcast generation job retrieved successfully."
+SEARCH_SUCCESS = "Podcast search results retrieved successfully."
+EVICTIONS_GET_SUCCESS = "Podcast evictions retrieved successfully."
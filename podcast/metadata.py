@@ -0,0 +1,50 @@
+import json
+from redis import asyncio as aioredis
+from common.schemas import PodcastMetadata
+
+
+# Hash fields holding JSON documents, every other field is stored as a plain string
+_JSON_FIELDS = ("urls", "timings")
+
+
+def metadata_key(filename: str) -> str:
+    return f"podcast:meta:{filename}"
+
+
+async def save_metadata(r: aioredis.Redis, metadata: PodcastMetadata, redis_key: str) -> None:
+    mapping = metadata.model_dump(mode="json", exclude_none=True)
+    mapping |= {name: json.dumps(mapping[name]) for name in _JSON_FIELDS}
+    await r.hset(metadata_key(metadata.filename), mapping=mapping | {"redis_key": redis_key})
+
+
+async def load_metadata_json(r: aioredis.Redis, filenames: list[str]) -> list[str]:
+    async with r.pipeline(transaction=False) as pipe:
+        for filename in filenames:
+            pipe.hgetall(metadata_key(filename))
+        records = await pipe.execute()
+    metadata = [_to_metadata(filename, record) for filename, record in zip(filenames, records)]
+    return [item.model_dump_json(by_alias=True) for item in metadata]
+
+
+async def save_timings(r: aioredis.Redis, filename: str, timings: dict[str, float]) -> None:
+    await r.hset(metadata_key(filename), "timings", json.dumps(timings))
+
+
+async def get_owner_key(r: aioredis.Redis, filename: str) -> str | None:
+    return await r.hget(metadata_key(filename), "redis_key")
+
+
+async def set_content_store_key(r: aioredis.Redis, filename: str, content_store_key: str) -> None:
+    await r.hset(metadata_key(filename), "content_store_key", content_store_key)
+
+
+async def get_content_store_key(r: aioredis.Redis, filename: str) -> str | None:
+    return await r.hget(metadata_key(filename), "content_store_key")
+
+
+def _to_metadata(filename: str, record: dict[str, str]) -> PodcastMetadata:
+    # Podcasts generated before metadata was recorded only have a filename
+    if not record:
+        return PodcastMetadata(filename=filename)
+    fields = record | {name: json.loads(record[name]) for name in _JSON_FIELDS if name in record}
+    return PodcastMetadata.model_validate(fields)
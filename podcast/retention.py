@@ -0,0 +1,154 @@
+import asyncio
+import os
+import time
+from datetime import datetime
+from redis import asyncio as aioredis
+from common import store
+from common.schemas import PodcastEviction
+from podcast import files as podcast_files, metadata as podcast_metadata, search as podcast_search
+from podcast import tts as podcast_tts
+from news import registry as news_registry
+
+
+PODCAST_QUOTA_BYTES = int(os.environ.get("PODCAST_QUOTA_MB", "5120")) * 1024 * 1024
+PODCAST_MAX_AGE_SECONDS = int(os.environ.get("PODCAST_MAX_AGE_DAYS", "30")) * 86400
+RETENTION_INTERVAL_SECONDS = 600  # 10 minutes
+RETENTION_MIN_AGE_SECONDS = 3600  # never evict podcasts younger than 1 hour
+RETENTION_GRAVITY = 1.8
+
+ACCESS_COUNT_KEY = "podcast:access:count"
+ACCESS_LAST_KEY = "podcast:access:last"
+EVICTIONS_STREAM = "podcast:evictions"
+EVICTIONS_STREAM_MAXLEN = 1000
+EVICTIONS_READ_BLOCK_MS = 5_000
+
+REASON_DELETED = "deleted"
+REASON_MAX_AGE = "max_age"
+REASON_QUOTA = "quota"
+
+
+async def record_access(r: aioredis.Redis, filename: str) -> None:
+    async with r.pipeline(transaction=False) as pipe:
+        pipe.zincrby(ACCESS_COUNT_KEY, 1, filename)
+        pipe.zadd(ACCESS_LAST_KEY, {filename: time.time()})
+        await pipe.execute()
+
+
+async def evict(r: aioredis.Redis, filename: str, reason: str) -> bool:
+    stat_results = [await podcast_files.stat_podcast_file(f"{filename}{ext}", cached=False) for ext in (".txt", ".mp3")]
+    byte_size = sum(stat_result.st_size for stat_result in stat_results if stat_result is not None)
+
+    # Unlist the podcast before its files disappear so listings never point at missing files
+    redis_key = await podcast_metadata.get_owner_key(r, filename)
+    content_store_key = await podcast_metadata.get_content_store_key(r, filename)
+    redis_keys = [redis_key] if redis_key is not None else news_registry.podcasts_keys()
+    if not any(stat_results) and redis_key is None and not await _is_listed(r, redis_keys, filename):
+        return False  # nothing to evict, page caches and the eviction log are left alone
+
+    async with r.pipeline(transaction=True) as pipe:
+        for key in redis_keys:
+            pipe.zrem(key, filename)
+            pipe.set(store.version_key(key), time.time_ns())
+        pipe.delete(podcast_metadata.metadata_key(filename))
+        pipe.zrem(ACCESS_COUNT_KEY, filename)
+        pipe.zrem(ACCESS_LAST_KEY, filename)
+        await pipe.execute()
+    if content_store_key is not None:
+        # Identical requests generate a new episode instead of reusing the evicted one
+        await store.delete_if_equal(r, content_store_key, filename)
+
+    await podcast_search.remove_transcript(filename)
+    await podcast_files.remove_podcast_file(f"{filename}.txt")
+    await podcast_files.remove_podcast_file(f"{filename}.mp3")
+
+    # Logged once the files are gone, other processes drop their cached stat results when they read it
+    await r.xadd(
+        EVICTIONS_STREAM,
+        {"filename": filename, "reason": reason, "byte_size": byte_size, "evicted_at": datetime.now().isoformat()},
+        maxlen=EVICTIONS_STREAM_MAXLEN,
+        approximate=True,
+    )
+    return True
+
+
+async def _is_listed(r: aioredis.Redis, redis_keys: list[str], filename: str) -> bool:
+    async with r.pipeline(transaction=False) as pipe:
+        for key in redis_keys:
+            pipe.zscore(key, filename)
+        scores = await pipe.execute()
+    return any(score is not None for score in scores)
+
+
+async def get_evictions(r: aioredis.Redis, limit: int) -> list[PodcastEviction]:
+    entries = await r.xrevrange(EVICTIONS_STREAM, count=limit)
+    return [PodcastEviction.model_validate(fields) for _, fields in entries]
+
+
+async def watch_evictions(r: aioredis.Redis) -> None:
+    latest = await r.xrevrange(EVICTIONS_STREAM, count=1)
+    last_id = latest[0][0] if latest else "0-0"
+    while True:
+        try:
+            res = await r.xread({EVICTIONS_STREAM: last_id}, block=EVICTIONS_READ_BLOCK_MS)
+        except aioredis.RedisError as e:
+            print(f"Error while watching podcast evictions: {e}")
+            await asyncio.sleep(1)
+            continue
+        for last_id, fields in res[0][1] if res else []:
+            podcast_files.forget_podcast_file(f"{fields['filename']}.txt")
+            podcast_files.forget_podcast_file(f"{fields['filename']}.mp3")
+
+
+async def enforce_retention(r: aioredis.Redis) -> None:
+    # The TTS cache shares the volume with the podcasts but has its own limit
+    await asyncio.to_thread(podcast_tts.prune_cache)
+
+    podcasts = await asyncio.to_thread(_scan_podcasts)
+    if not podcasts:
+        return
+
+    async with r.pipeline(transaction=False) as pipe:
+        pipe.zrange(ACCESS_COUNT_KEY, 0, -1, withscores=True)
+        pipe.zrange(ACCESS_LAST_KEY, 0, -1, withscores=True)
+        access_counts, last_accesses = await pipe.execute()
+    access_counts, last_accesses = dict(access_counts), dict(last_accesses)
+
+    now = time.time()
+    candidates = []
+    total_bytes = 0
+    for filename, (byte_size, created_at) in podcasts.items():
+        total_bytes += byte_size
+        if now - created_at < RETENTION_MIN_AGE_SECONDS:
+            continue
+        idle_seconds = now - last_accesses.get(filename, created_at)
+        if idle_seconds > PODCAST_MAX_AGE_SECONDS:
+            await evict(r, filename, REASON_MAX_AGE)
+            total_bytes -= byte_size
+            continue
+        # Accesses decay with idle time, the same way Hacker News ranks stories
+        value = (access_counts.get(filename, 0) + 1) / (idle_seconds / 3600 + 2) ** RETENTION_GRAVITY
+        candidates.append((value, filename, byte_size))
+
+    for _, filename, byte_size in sorted(candidates):
+        if total_bytes <= PODCAST_QUOTA_BYTES:
+            break
+        await evict(r, filename, REASON_QUOTA)
+        total_bytes -= byte_size
+
+
+def _scan_podcasts() -> dict[str, tuple[int, float]]:
+    # filename -> (total bytes of the .txt and .mp3 files, oldest modification time)
+    podcasts: dict[str, tuple[int, float]] = {}
+    try:
+        entries = list(os.scandir(podcast_files.PODCASTS_DIR))
+    except FileNotFoundError:
+        return podcasts
+
+    for entry in entries:
+        filename, ext = os.path.splitext(entry.name)
+        if ext not in (".txt", ".mp3") or not entry.is_file():
+            continue
+        stat_result = entry.stat()
+        byte_size, created_at = podcasts.get(filename, (0, stat_result.st_mtime))
+        podcasts[filename] = (byte_size + stat_result.st_size, min(created_at, stat_result.st_mtime))
+    return podcasts
@@ -1,13 +1,19 @@
-from fastapi import APIRouter, Depends, Path
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, Path, Query, Request
+from fastapi.responses import StreamingResponse
 from common.depends import get_redis
-from common.schemas import ResponseModel
+from common.schemas import PodcastEviction, PodcastJob, PodcastSearchResult, ResponseModel
 from starlette import status
-from podcast import service as podcast_service
+from podcast import service as podcast_service, jobs as podcast_jobs, messages as podcast_messages
+from podcast import files as podcast_files, retention as podcast_retention, search as podcast_search
+from podcast import lifespan as podcast_lifespan
 from redis import asyncio as aioredis
 
 
-router = APIRouter(prefix="/podcasts", tags=["Podcasts"])
+router = APIRouter(
+    prefix="/podcasts",
+    tags=["Podcasts"],
+    lifespan=podcast_lifespan.lifespan,
+)
 
 filename_param = Path(
     regex=r"^[^/]+$",
@@ -16,23 +22,80 @@ filename_param = Path(
 )
 
 
+@router.get("/jobs/{job_id}", response_model=ResponseModel[PodcastJob], status_code=status.HTTP_200_OK)
+async def get_podcast_job(job_id: str, r: aioredis.Redis = Depends(get_redis)):
+    job = await podcast_jobs.get_job(r, job_id)
+    return ResponseModel(
+        data=job,
+        message=podcast_messages.JOB_GET_SUCCESS,
+    )
+
+
+@router.get("/jobs/{job_id}/events", status_code=status.HTTP_200_OK)
+async def get_podcast_job_events(job_id: str, r: aioredis.Redis = Depends(get_redis)):
+    await podcast_jobs.get_job(r, job_id)
+    data = podcast_jobs.follow_job_events(r, job_id)
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(data, media_type="text/event-stream", headers=headers)
+
+
+@router.get("/search", response_model=ResponseModel[list[PodcastSearchResult]], status_code=status.HTTP_200_OK)
+async def search_podcasts(
+    q: str = Query(min_length=1, max_length=100, description="Words that must all appear in the transcript"),
+    limit: int = Query(gt=0, le=30, default=20),
+    page: int = Query(gt=0, default=1),
+):
+    results = await podcast_search.search(q, limit, page)
+    return ResponseModel(
+        data=results,
+        message=podcast_messages.SEARCH_SUCCESS,
+    )
+
+
+@router.get("/evictions", response_model=ResponseModel[list[PodcastEviction]], status_code=status.HTTP_200_OK)
+async def get_podcast_evictions(
+    r: aioredis.Redis = Depends(get_redis),
+    limit: int = Query(gt=0, le=100, default=20),
+):
+    evictions = await podcast_retention.get_evictions(r, limit)
+    return ResponseModel(
+        data=evictions,
+        message=podcast_messages.EVICTIONS_GET_SUCCESS,
+    )
+
+
 @router.get("/{filename}.txt", response_model=ResponseModel[str], status_code=status.HTTP_200_OK)
-async def get_podcast_text(filename: str = filename_param):
-    filepath = await podcast_service.get_podcast_filepath(f"{filename}.txt")
-    return FileResponse(
-        path=filepath,
+async def get_podcast_text(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    filename: str = filename_param,
+    r: aioredis.Redis = Depends(get_redis),
+):
+    stat_result = await podcast_service.get_podcast_file(f"{filename}.txt")
+    _record_access(request, background_tasks, r, filename)
+    return podcast_files.podcast_file_response(
+        request,
         filename=f"{filename}.txt",
+        stat_result=stat_result,
         media_type="application/octet-stream",
     )
 
 
 @router.get("/{filename}.mp3", status_code=status.HTTP_200_OK)
-async def get_podcast_audio(filename: str = filename_param):
-    filepath = await podcast_service.get_podcast_filepath(f"{filename}.mp3")
-    return FileResponse(
-        path=filepath,
+async def get_podcast_audio(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    filename: str = filename_param,
+    r: aioredis.Redis = Depends(get_redis),
+):
+    stat_result = await podcast_service.get_podcast_file(f"{filename}.mp3")
+    _record_access(request, background_tasks, r, filename)
+    return podcast_files.podcast_file_response(
+        request,
         filename=f"{filename}.mp3",
-        media_type="application/octet-stream",
+        stat_result=stat_result,
+        media_type="audio/mpeg",
+        content_disposition_type="inline",
     )
 
 
@@ -40,3 +103,9 @@ async def get_podcast_audio(filename: str = filename_param):
 async def delete_podcast(filename: str = filename_param, r: aioredis.Redis = Depends(get_redis)):
     await podcast_service.delete_podcast(r, filename)
     return
+
+
+def _record_access(request: Request, background_tasks: BackgroundTasks, r: aioredis.Redis, filename: str) -> None:
+    # Players fetch audio in several ranges, only count the request that starts from the beginning
+    if request.headers.get("Range", "bytes=0-").startswith("bytes=0-"):
+        background_tasks.add_task(podcast_retention.record_access, r, filename)
@@ -0,0 +1,178 @@
+import asyncio
+import os
+import re
+import sqlite3
+from datetime import datetime
+from common.schemas import PodcastSearchResult
+from podcast import files as podcast_files
+
+
+SEARCH_INDEX_PATH = os.path.join("output", "index", "transcripts.db")
+SEARCH_SNIPPET_CHARS = 160
+SQLITE_BUSY_TIMEOUT_MS = 5000
+
+# Hangul, kana and CJK ideographs have no spaces between words reliably, they are indexed as character bigrams
+_CJK = "\u1100-\u11ff\u3040-\u30ff\u3130-\u318f\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af"
+_TERM = re.compile(f"[{_CJK}]+|[^\\W{_CJK}_]+")
+_CJK_RUN = re.compile(f"^[{_CJK}]+$")
+
+_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS transcripts USING fts5(
+    filename UNINDEXED,
+    source UNINDEXED,
+    created_at UNINDEXED,
+    text UNINDEXED,
+    tokens,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+_initialized = False
+
+
+def tokenize(text: str, query: bool = False) -> list[str]:
+    tokens = []
+    for term in _TERM.findall(text.lower()):
+        if _CJK_RUN.match(term) and len(term) > 1:
+            tokens.extend(term[i : i + 2] for i in range(len(term) - 1))
+            if not query:
+                tokens.append(term[-1])  # lets a single character query match at the end of a word
+        else:
+            tokens.append(term)
+    return tokens
+
+
+async def index_transcript(filename: str, source: str | None, created_at: datetime, text: str) -> None:
+    try:
+        await asyncio.to_thread(_index, filename, source, created_at.isoformat(), text)
+    except sqlite3.Error as e:
+        print(f"Error during transcript indexing ({filename}): {e}")
+
+
+async def remove_transcript(filename: str) -> None:
+    try:
+        await asyncio.to_thread(_remove, filename)
+    except sqlite3.Error as e:
+        print(f"Error during transcript index removal ({filename}): {e}")
+
+
+async def search(query: str, limit: int, page: int) -> list[PodcastSearchResult]:
+    match = _match_expression(query)
+    if match is None:
+        return []
+    rows = await asyncio.to_thread(_search, match, limit, (page - 1) * limit)
+    terms = query.lower().split()
+    return [
+        PodcastSearchResult(
+            filename=filename,
+            source=source,
+            created_at=created_at,
+            snippet=_snippet(text, terms),
+            score=round(-rank, 4),
+        )
+        for filename, source, created_at, text, rank in rows
+    ]
+
+
+async def backfill() -> int:
+    # Indexes transcripts written before the index existed or while it was unavailable
+    try:
+        return await asyncio.to_thread(_backfill)
+    except sqlite3.Error as e:
+        print(f"Error during transcript index backfill: {e}")
+        return 0
+
+
+def _connect() -> sqlite3.Connection:
+    global _initialized
+    if not _initialized:
+        os.makedirs(os.path.dirname(SEARCH_INDEX_PATH), exist_ok=True)
+    conn = sqlite3.connect(SEARCH_INDEX_PATH, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000)
+    if not _initialized:
+        # WAL lets searches run while another worker process writes
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(_SCHEMA)
+        _initialized = True
+    return conn
+
+
+def _index(filename: str, source: str | None, created_at: str, text: str) -> None:
+    conn = _connect()
+    try:
+        _replace(conn, filename, source, created_at, text)
+    finally:
+        conn.close()
+
+
+def _replace(conn: sqlite3.Connection, filename: str, source: str | None, created_at: str, text: str) -> None:
+    with conn:
+        conn.execute("DELETE FROM transcripts WHERE filename = ?", (filename,))
+        conn.execute(
+            "INSERT INTO transcripts (filename, source, created_at, text, tokens) VALUES (?, ?, ?, ?, ?)",
+            (filename, source, created_at, text, " ".join(tokenize(text))),
+        )
+
+
+def _remove(filename: str) -> None:
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute("DELETE FROM transcripts WHERE filename = ?", (filename,))
+    finally:
+        conn.close()
+
+
+def _search(match: str, limit: int, offset: int) -> list[tuple]:
+    conn = _connect()
+    try:
+        return conn.execute(
+            "SELECT filename, source, created_at, text, rank FROM transcripts WHERE transcripts MATCH ?"
+            " ORDER BY rank LIMIT ? OFFSET ?",
+            (match, limit, offset),
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+def _backfill() -> int:
+    try:
+        entries = [entry for entry in os.scandir(podcast_files.PODCASTS_DIR) if entry.name.endswith(".txt")]
+    except FileNotFoundError:
+        return 0
+
+    conn = _connect()
+    try:
+        indexed = {filename for (filename,) in conn.execute("SELECT filename FROM transcripts")}
+        missing = [entry for entry in entries if entry.name.removesuffix(".txt") not in indexed]
+        # Every worker process backfills at startup, replacing the rows keeps a transcript indexed once
+        for entry in missing:
+            with open(entry.path, encoding="utf-8") as f:
+                text = f.read()
+            created_at = datetime.fromtimestamp(entry.stat().st_mtime).isoformat()
+            _replace(conn, entry.name.removesuffix(".txt"), None, created_at, text)
+        return len(missing)
+    finally:
+        conn.close()
+
+
+def _match_expression(query: str) -> str | None:
+    # Every query word must match as a phrase of its tokens, quoting keeps FTS5 operators out of user input
+    phrases = []
+    for word in query.split():
+        tokens = tokenize(word, query=True)
+        if not tokens:
+            continue
+        phrase = '"' + " ".join(tokens) + '"'
+        # A single Hangul or CJK character also matches the bigrams it starts
+        if len(tokens) == 1 and len(tokens[0]) == 1 and _CJK_RUN.match(tokens[0]):
+            phrase += "*"
+        phrases.append(phrase)
+    return " AND ".join(phrases) or None
+
+
+def _snippet(text: str, terms: list[str]) -> str:
+    lowered = text.lower()
+    positions = [position for term in terms if (position := lowered.find(term)) >= 0]
+    start = max(0, min(positions, default=0) - SEARCH_SNIPPET_CHARS // 4)
+    snippet = " ".join(text[start : start + SEARCH_SNIPPET_CHARS].split())
+    return ("…" if start > 0 else "") + snippet + ("…" if start + SEARCH_SNIPPET_CHARS < len(text) else "")
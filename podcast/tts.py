@@ -0,0 +1,154 @@
+import asyncio
+import hashlib
+import os
+import random
+import time
+import uuid
+from google.api_core import exceptions as google_exceptions
+from google.cloud import texttospeech
+from common import metrics
+from podcast import clients
+
+
+TTS_VOICES = (("Speaker1", "Kore"), ("Speaker2", "Charon"))
+TTS_MAX_CONCURRENCY = int(os.environ.get("TTS_MAX_CONCURRENCY", "4"))
+TTS_REQUESTS_PER_MINUTE = int(os.environ.get("TTS_REQUESTS_PER_MINUTE", "60"))
+TTS_MAX_RETRIES = 3
+TTS_BACKOFF_SECONDS = 1.0
+TTS_RETRY_EXCEPTIONS = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+)
+TTS_CACHE_DIR = os.path.join("output", "cache", "tts")
+TTS_CACHE_MAX_BYTES = int(os.environ.get("TTS_CACHE_MAX_MB", "1024")) * 1024 * 1024
+TTS_CACHE_TTL_SECONDS = 86400 * 7  # 7 days since the chunk was last used
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+_semaphore = asyncio.Semaphore(TTS_MAX_CONCURRENCY)
+_bucket = TokenBucket(rate=TTS_REQUESTS_PER_MINUTE / 60, capacity=TTS_MAX_CONCURRENCY)
+
+
+async def synthesize(model: str, text: str) -> bytes:
+    cache_path = os.path.join(TTS_CACHE_DIR, f"{_cache_key(model, text)}.mp3")
+    audio = await asyncio.to_thread(_read_cache, cache_path)
+    metrics.record_cache("tts", hit=audio is not None)
+    if audio is not None:
+        return audio
+
+    async with _semaphore:
+        with metrics.timed(metrics.PODCAST_TTS_CHUNK_SECONDS, "podcast.tts", model=model):
+            audio = await _synthesize_with_retry(model, text)
+
+    try:
+        await asyncio.to_thread(_write_cache, cache_path, audio)
+    except OSError as e:  # the chunk is already paid for, a full disk must not fail the podcast
+        print(f"Error during TTS cache write ({cache_path}): {e}")
+    return audio
+
+
+def _cache_key(model: str, text: str) -> str:
+    voices = ",".join(f"{alias}={voice}" for alias, voice in TTS_VOICES)
+    return hashlib.sha256(f"{model}\n{voices}\n{text}".encode()).hexdigest()
+
+
+def _read_cache(path: str) -> bytes | None:
+    try:
+        with open(path, "rb") as f:
+            audio = f.read()
+        os.utime(path)  # the modification time records the last use, pruning drops the least recently used
+        return audio
+    except FileNotFoundError:
+        return None
+
+
+def _write_cache(path: str, audio: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(audio)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def prune_cache() -> int:
+    # Removes chunks unused for the TTL, then the least recently used ones beyond the size limit
+    try:
+        entries = [entry for entry in os.scandir(TTS_CACHE_DIR) if entry.name.endswith(".mp3")]
+    except FileNotFoundError:
+        return 0
+
+    now = time.time()
+    cached = sorted((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in entries)
+    total_bytes = sum(size for _, size, _ in cached)
+    removed = 0
+    for mtime, size, path in cached:
+        if now - mtime <= TTS_CACHE_TTL_SECONDS and total_bytes <= TTS_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total_bytes -= size
+        removed += 1
+    return removed
+
+
+async def _synthesize_with_retry(model: str, text: str) -> bytes:
+    for attempt in range(TTS_MAX_RETRIES + 1):
+        await _bucket.acquire()
+        try:
+            return await _synthesize(model, text)
+        except TTS_RETRY_EXCEPTIONS as e:
+            if attempt == TTS_MAX_RETRIES:
+                raise
+            delay = TTS_BACKOFF_SECONDS * 2**attempt * random.uniform(0.5, 1.5)
+            print(f"TTS request failed ({e}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+async def _synthesize(model: str, text: str) -> bytes:
+    synthesis_input = texttospeech.SynthesisInput(text=text)
+    speaker_voice_configs = [
+        texttospeech.MultispeakerPrebuiltVoice(speaker_alias=alias, speaker_id=voice) for alias, voice in TTS_VOICES
+    ]
+    multi_speaker_voice_config = texttospeech.MultiSpeakerVoiceConfig(speaker_voice_configs=speaker_voice_configs)
+    voice = texttospeech.VoiceSelectionParams(
+        language_code="ko-KR",
+        model_name=model,
+        multi_speaker_voice_config=multi_speaker_voice_config,
+    )
+    audio_config = texttospeech.AudioConfig(
+        audio_encoding=texttospeech.AudioEncoding.MP3,
+        sample_rate_hertz=24000,
+    )
+    response = await clients.get_tts_client().synthesize_speech(
+        input=synthesis_input, voice=voice, audio_config=audio_config
+    )
+    return response.audio_content